@@ -1,9 +1,11 @@
+from django.core.cache import cache
 from django.test import TestCase, Client
 
 
 class StaticURLTests(TestCase):
 
     def setUp(self):
+        cache.clear()
         self.guest_client = Client()
 
     def test_pages_urls_exist_at_desired_location_about(self):
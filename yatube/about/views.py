@@ -1,9 +1,20 @@
+from django.utils.decorators import method_decorator
 from django.views.generic.base import TemplateView
 
+from core.cache import page_conditions, versioned_cache_page
+from yatube.settings import PAGE_CACHE_TIMEOUT
 
+cache_about_page = [
+    page_conditions,
+    versioned_cache_page(PAGE_CACHE_TIMEOUT, key_prefix='about_page'),
+]
+
+
+@method_decorator(cache_about_page, name='dispatch')
 class AboutAuthorView(TemplateView):
     template_name = 'about/author.html'
 
 
+@method_decorator(cache_about_page, name='dispatch')
 class AboutTechView(TemplateView):
     template_name = 'about/tech.html'
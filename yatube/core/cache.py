@@ -0,0 +1,162 @@
+import hashlib
+import math
+import random
+import time
+from collections import namedtuple
+from datetime import datetime, timezone
+from functools import wraps
+
+from django.core.cache import cache
+from django.utils.cache import quote_etag
+from django.utils.http import http_date
+from django.views.decorators.http import condition
+
+GENERATION_KEY = 'pages:generation'
+# Когда в последний раз сменилось поколение, для Last-Modified.
+CHANGED_KEY = 'pages:changed'
+# Сколько хранится устаревшая копия страницы, пока её пересчитывают.
+STALE_TIMEOUT = 60 * 60
+# Сколько живёт блокировка пересчёта, если пересчитывающий процесс упал.
+LOCK_TIMEOUT = 30
+# Сколько ждать чужого пересчёта, когда отдать нечего.
+LOCK_WAIT = 5
+LOCK_POLL = 0.05
+# Чем больше, тем раньше начинается вероятностное обновление.
+EARLY_REFRESH_BETA = 1.0
+
+Entry = namedtuple('Entry', 'generation expires delta response')
+
+
+def generation():
+    """Текущее поколение закэшированных страниц."""
+    value = cache.get(GENERATION_KEY)
+    if value is None:
+        # Начинаем с текущего времени, чтобы после потери ключа
+        # не вернуться к номеру поколения, под которым уже лежат страницы.
+        cache.add(GENERATION_KEY, int(time.time() * 1000), None)
+        cache.add(CHANGED_KEY, int(time.time()), None)
+        value = cache.get(GENERATION_KEY)
+    return value
+
+
+def bump_generation():
+    """Делает устаревшими все страницы, закэшированные до этого момента."""
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        generation()
+    cache.set(CHANGED_KEY, int(time.time()), None)
+
+
+def page_key(key_prefix, request):
+    """Одна копия на адрес: свои куски пользователь получает от fill_holes."""
+    path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    return f'{key_prefix}:{path}'
+
+
+def etag(current, request):
+    """Страница с дописанными кусками меняется с поколением и пользователем."""
+    user = request.user.pk if request.user.is_authenticated else 0
+    return f'{current}-{user}'
+
+
+def page_etag(request, *args, **kwargs):
+    return etag(generation(), request)
+
+
+def page_last_modified(request, *args, **kwargs):
+    changed = cache.get(CHANGED_KEY)
+    if changed is None:
+        return None
+    return datetime.fromtimestamp(changed, timezone.utc)
+
+
+# Отвечает 304 до чтения кэша страниц и обращений к базе.
+page_conditions = condition(
+    etag_func=page_etag, last_modified_func=page_last_modified)
+
+
+def is_fresh(entry, current):
+    """Проверяет копию с учётом вероятностного раннего обновления.
+
+    Чем ближе срок и чем дольше страница строилась, тем вероятнее,
+    что очередной запрос пересчитает её заранее (алгоритм XFetch).
+    """
+    if entry is None or entry.generation != current:
+        return False
+    jitter = -entry.delta * EARLY_REFRESH_BETA * math.log(
+        1 - random.random())
+    return time.time() + jitter < entry.expires
+
+
+def wait_for_entry(key, current):
+    deadline = time.monotonic() + LOCK_WAIT
+    while time.monotonic() < deadline:
+        time.sleep(LOCK_POLL)
+        entry = cache.get(key)
+        if entry is not None and entry.generation == current:
+            return entry
+    return None
+
+
+def stale_response(entry, timeout, request):
+    """Устаревшая копия с валидаторами её поколения, а не текущего.
+
+    Иначе клиент получил бы на старую страницу свежий ETag и продолжал
+    бы получать 304 вместо новой версии.
+    """
+    response = entry.response
+    response['ETag'] = quote_etag(etag(entry.generation, request))
+    response['Last-Modified'] = http_date(entry.expires - timeout)
+    return response
+
+
+def store(key, current, timeout, started, response):
+    if getattr(response, 'is_rendered', True) is False:
+        # TemplateResponse нельзя сохранить до отрисовки.
+        response.render()
+    if response.status_code == 200 and not response.streaming:
+        cache.set(key, Entry(
+            current,
+            time.time() + timeout,
+            time.monotonic() - started,
+            response,
+        ), timeout + STALE_TIMEOUT)
+
+
+def versioned_cache_page(timeout, key_prefix):
+    """Кэширует ответ view до истечения timeout или смены поколения.
+
+    Пересчитывает страницу только один запрос — тот, что взял блокировку
+    в кэше; остальные в это время получают устаревшую копию.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view(request, *args, **kwargs)
+            key = page_key(key_prefix, request)
+            current = generation()
+            entry = cache.get(key)
+            if is_fresh(entry, current):
+                request.page_cache = 'hit'
+                return entry.response
+            lock = f'{key}:lock'
+            if not cache.add(lock, True, LOCK_TIMEOUT):
+                if entry is None:
+                    entry = wait_for_entry(key, current)
+                if entry is not None:
+                    request.page_cache = 'stale'
+                    return stale_response(entry, timeout, request)
+                request.page_cache = 'miss'
+                return view(request, *args, **kwargs)
+            request.page_cache = 'miss'
+            try:
+                started = time.monotonic()
+                response = view(request, *args, **kwargs)
+                store(key, current, timeout, started, response)
+            finally:
+                cache.delete(lock)
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,261 @@
+import fcntl
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.core.cache.backends.filebased import FileBasedCache
+
+# Пометка в канале, что весь кэш очищен.
+CLEAR_ALL = '*'
+
+tiers = {}
+tiers_lock = threading.Lock()
+
+
+class LocalTier:
+    """LRU процесса и позиция в канале сброса, общие для всех потоков."""
+
+    def __init__(self, channel, size, timeout):
+        self.channel = channel
+        self.size = size
+        self.timeout = timeout
+        self.writer = f'{os.getpid()}-{id(self)}'
+        self.items = OrderedDict()
+        self.lock = threading.Lock()
+        self.inode = None
+        self.offset = 0
+
+    def receive(self):
+        """Выбрасывает ключи, изменённые другими процессами."""
+        try:
+            stat = os.stat(self.channel)
+        except FileNotFoundError:
+            return
+        with self.lock:
+            if stat.st_ino != self.inode:
+                self.items.clear()
+                self.inode = stat.st_ino
+                self.offset = 0
+            if stat.st_size <= self.offset:
+                return
+            with open(self.channel, 'rb') as channel:
+                channel.seek(self.offset)
+                data = channel.read(stat.st_size - self.offset)
+            # Недописанную строку прочитаем в следующий раз.
+            data = data[:data.rfind(b'\n') + 1]
+            self.offset += len(data)
+            for line in data.decode().splitlines():
+                writer, _, key = line.partition('\t')
+                if writer == self.writer:
+                    continue
+                if key == CLEAR_ALL:
+                    self.items.clear()
+                else:
+                    self.items.pop(key, None)
+
+    def remember(self, key, value, timeout):
+        if timeout is not None:
+            timeout = min(timeout, self.timeout)
+        expires = time.monotonic() + timeout if timeout is not None else None
+        data = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        with self.lock:
+            self.items[key] = (data, expires)
+            self.items.move_to_end(key)
+            while len(self.items) > self.size:
+                self.items.popitem(last=False)
+
+    def recall(self, key):
+        with self.lock:
+            item = self.items.get(key)
+            if item is None:
+                return None
+            data, expires = item
+            if expires is not None and expires <= time.monotonic():
+                del self.items[key]
+                return None
+            self.items.move_to_end(key)
+        return data
+
+    def forget(self, key):
+        with self.lock:
+            self.items.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.items.clear()
+
+
+def local_tier(channel, size, timeout):
+    """Один LocalTier на процесс, хотя Django создаёт кэш в каждом потоке."""
+    key = (channel, os.getpid())
+    with tiers_lock:
+        if key not in tiers:
+            tiers[key] = LocalTier(channel, size, timeout)
+        return tiers[key]
+
+
+class TwoTierCache(BaseCache):
+    """Небольшой LRU в памяти процесса перед общим для всех воркеров кэшем.
+
+    Читает сначала из памяти, пишет сразу в оба уровня. Каждая запись
+    и удаление дописывают ключ в общий файл-канал, по которому остальные
+    процессы выбрасывают свои локальные копии. add() и incr() выполняются
+    под файловой блокировкой, чтобы счётчики и блокировки были общими.
+    """
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get('OPTIONS', {})
+        self.shared_alias = options['SHARED']
+        self.channel_max_size = options.get('CHANNEL_MAX_SIZE', 1024 * 1024)
+        os.makedirs(location, exist_ok=True)
+        self.channel = os.path.join(location, 'invalidations')
+        self.lock_path = os.path.join(location, 'lock')
+        # Сколько держать в памяти ключ, прочитанный из общего кэша:
+        # срок жизни там неизвестен.
+        self.local = local_tier(
+            self.channel,
+            options.get('LOCAL_SIZE', 1000),
+            options.get('LOCAL_TIMEOUT', 60),
+        )
+
+    @property
+    def shared(self):
+        return caches[self.shared_alias]
+
+    @contextmanager
+    def shared_lock(self):
+        with open(self.lock_path, 'a') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def publish(self, *keys):
+        lines = ''.join(f'{self.local.writer}\t{key}\n' for key in keys)
+        # Под блокировкой, иначе строка может уйти в уже заменённый файл.
+        with self.shared_lock():
+            with open(self.channel, 'a') as channel:
+                channel.write(lines)
+                size = channel.tell()
+            if size > self.channel_max_size:
+                self.restart_channel()
+
+    def compact(self):
+        with self.shared_lock():
+            self.restart_channel()
+
+    def restart_channel(self):
+        """Начинает канал заново: читатели по смене inode очистят память."""
+        fresh = f'{self.channel}.{self.local.writer}'
+        open(fresh, 'w').close()
+        os.replace(fresh, self.channel)
+
+    def local_timeout(self, timeout):
+        if timeout is DEFAULT_TIMEOUT:
+            return self.default_timeout
+        return timeout
+
+    def get(self, key, default=None, version=None):
+        local_key = self.make_key(key, version)
+        self.local.receive()
+        data = self.local.recall(local_key)
+        if data is not None:
+            return pickle.loads(data)
+        value = self.shared.get(key, version=version)
+        if value is None:
+            return default
+        self.local.remember(local_key, value, self.local.timeout)
+        return value
+
+    def get_many(self, keys, version=None):
+        self.local.receive()
+        found, missing = {}, []
+        for key in keys:
+            data = self.local.recall(self.make_key(key, version))
+            if data is None:
+                missing.append(key)
+            else:
+                found[key] = pickle.loads(data)
+        if missing:
+            for key, value in self.shared.get_many(
+                    missing, version=version).items():
+                self.local.remember(
+                    self.make_key(key, version), value, self.local.timeout)
+                found[key] = value
+        return found
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        local_key = self.make_key(key, version)
+        self.shared.set(key, value, timeout, version=version)
+        self.publish(local_key)
+        self.local.remember(local_key, value, self.local_timeout(timeout))
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        with self.shared_lock():
+            added = self.shared.add(key, value, timeout, version=version)
+        if added:
+            local_key = self.make_key(key, version)
+            self.publish(local_key)
+            self.local.remember(local_key, value, self.local_timeout(timeout))
+        return added
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        return self.shared.touch(key, timeout, version=version)
+
+    def delete(self, key, version=None):
+        local_key = self.make_key(key, version)
+        self.shared.delete(key, version=version)
+        self.local.forget(local_key)
+        self.publish(local_key)
+
+    def has_key(self, key, version=None):
+        self.local.receive()
+        if self.local.recall(self.make_key(key, version)) is not None:
+            return True
+        return self.shared.has_key(key, version=version)
+
+    def incr(self, key, delta=1, version=None):
+        local_key = self.make_key(key, version)
+        with self.shared_lock():
+            if isinstance(self.shared, FileBasedCache):
+                value = self.shared.get(key, version=version)
+                if value is None:
+                    raise ValueError(f"Key '{key}' not found")
+                value += delta
+                self.shared.set(key, value, self.shared_timeout(key, version),
+                                version=version)
+            else:
+                value = self.shared.incr(key, delta, version=version)
+        self.local.forget(local_key)
+        self.publish(local_key)
+        return value
+
+    def shared_timeout(self, key, version=None):
+        """Сколько ещё жить ключу в файловом кэше.
+
+        FileBasedCache.incr перезаписывает значение со сроком по умолчанию,
+        поэтому срок берётся из заголовка файла и сохраняется.
+        """
+        try:
+            with open(self.shared._key_to_file(key, version), 'rb') as file:
+                expiry = pickle.load(file)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return DEFAULT_TIMEOUT
+        if expiry is None:
+            return None
+        return max(expiry - time.time(), 1)
+
+    def clear(self):
+        self.shared.clear()
+        self.local.clear()
+        self.publish(CLEAR_ALL)
+
+    def close(self, **kwargs):
+        self.shared.close(**kwargs)
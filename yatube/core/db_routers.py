@@ -0,0 +1,50 @@
+import random
+import threading
+
+from django.core.cache import cache
+
+from yatube.settings import REPLICA_DATABASES
+
+# Поколение кэша страниц, до которого реплики догнали основную базу.
+SYNCED_KEY = 'replicas:generation'
+
+state = threading.local()
+
+
+def replicas_allowed():
+    return getattr(state, 'replicas', False) and not getattr(
+        state, 'wrote', False)
+
+
+def mark_synced(current):
+    cache.set(SYNCED_KEY, current, None)
+
+
+def replicas_fresh(current):
+    """Реплики содержат все изменения, о которых знает кэш страниц."""
+    synced = cache.get(SYNCED_KEY)
+    return synced is not None and synced >= current
+
+
+class ReplicaRouter:
+    """Чтение в безопасных запросах идёт в реплики, всё остальное — в основную.
+
+    Реплики включает промежуточный слой replica_reads только на время
+    запроса, поэтому команды, сигналы и фоновые потоки читают основную
+    базу. После первой записи запрос до конца читает основную базу.
+    """
+
+    def db_for_read(self, model, **hints):
+        if REPLICA_DATABASES and replicas_allowed():
+            return random.choice(REPLICA_DATABASES)
+        return 'default'
+
+    def db_for_write(self, model, **hints):
+        state.wrote = True
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db not in REPLICA_DATABASES
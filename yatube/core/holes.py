@@ -0,0 +1,57 @@
+import base64
+import json
+import re
+
+from django.utils.module_loading import autodiscover_modules
+
+# Пометка на месте пропущенного куска: имя и аргументы в base64 от JSON,
+# чтобы в них не встретилось окончание комментария.
+MARKER = '<!--hole:{}:{}-->'
+MARKER_RE = re.compile(rb'<!--hole:(\w+):([\w=-]*)-->')
+
+registry = {}
+
+
+def register(name):
+    """Регистрирует функцию (request, *args) -> str, заполняющую дыру."""
+    def decorator(func):
+        registry[name] = func
+        return func
+    return decorator
+
+
+def marker(name, *args):
+    payload = base64.urlsafe_b64encode(json.dumps(args).encode()).decode()
+    return MARKER.format(name, payload)
+
+
+def fill(content, request):
+    def render(match):
+        name = match.group(1).decode()
+        args = json.loads(base64.urlsafe_b64decode(match.group(2)))
+        return registry[name](request, *args).encode()
+    return MARKER_RE.sub(render, content)
+
+
+def fill_holes(get_response):
+    """Дописывает в готовую страницу то, что зависит от пользователя.
+
+    Сама страница, в том числе из кэша, одна на всех: вместо шапки,
+    кнопок и формы комментария в ней стоят пометки {% hole %}. Стоит
+    после CsrfViewMiddleware, чтобы токен из формы попал и в куку.
+    """
+    autodiscover_modules('holes')
+
+    def middleware(request):
+        response = get_response(request)
+        if (response.streaming
+                or not response.get('Content-Type', '').startswith(
+                    'text/html')
+                or b'<!--hole:' not in response.content):
+            return response
+        response.content = fill(response.content, request)
+        if response.has_header('Content-Length'):
+            response['Content-Length'] = str(len(response.content))
+        return response
+
+    return middleware
@@ -0,0 +1,90 @@
+from django.core.cache import InvalidCacheBackendError, cache, caches
+from django.core.management.base import CommandError
+from sorl.thumbnail import default
+from sorl.thumbnail.conf import defaults as sorl_defaults
+from sorl.thumbnail.conf import settings as sorl_settings
+from sorl.thumbnail.images import ImageFile
+from sorl.thumbnail.kvstores.base import KVStoreBase, add_prefix
+
+from yatube.settings import THUMBNAIL_GEOMETRIES
+
+NO_KEY_LIST = (
+    'Хранилище миниатюр лежит в кэше и не может перечислить свои ключи, '
+    'поэтому thumbnail cleanup и clear с ним не работают. Записи '
+    'истекают сами через THUMBNAIL_CACHE_TIMEOUT; чтобы сбросить их '
+    'сразу, очистите кэш THUMBNAIL_CACHE.'
+)
+
+
+class KVStore(KVStoreBase):
+    """Хранилище sorl-thumbnail в кэше проекта вместо таблицы в базе.
+
+    Своего слоя в памяти нет: это делает локальный уровень TwoTierCache,
+    который и сбрасывается между процессами. prefetch() заполняет его
+    для целой страницы одним запросом get_many.
+
+    Общего списка ключей тоже нет, как и в cached_db_kvstore: миниатюры
+    картинки sorl сам помнит в её записи 'thumbnails', а устаревшие
+    записи истекают по THUMBNAIL_CACHE_TIMEOUT. Поэтому команды
+    thumbnail cleanup и clear с этим хранилищем завершаются с ошибкой.
+    """
+
+    @property
+    def cache(self):
+        try:
+            return caches[sorl_settings.THUMBNAIL_CACHE]
+        except InvalidCacheBackendError:
+            return cache
+
+    def prefetch(self, keys):
+        """Загружает ключи страницы в память процесса одним запросом."""
+        if keys:
+            self.cache.get_many(keys)
+
+    def _get_raw(self, key):
+        return self.cache.get(key)
+
+    def _set_raw(self, key, value):
+        self.cache.set(key, value, sorl_settings.THUMBNAIL_CACHE_TIMEOUT)
+
+    def _delete_raw(self, *keys):
+        self.cache.delete_many(keys)
+
+    def _find_keys_raw(self, prefix):
+        # Нужен только командам thumbnail cleanup и clear.
+        raise CommandError(NO_KEY_LIST)
+
+
+def thumbnail_key(image, geometry, options):
+    """Ключ миниатюры в хранилище, как его вычисляет get_thumbnail().
+
+    Повторяет ThumbnailBackend.get_thumbnail() и опирается на его
+    внутренние _get_format и _get_thumbnail_filename: при обновлении
+    sorl-thumbnail (закреплён в requirements.txt) сверить с ним.
+    """
+    backend = default.backend
+    source = ImageFile(image)
+    options = dict(options)
+    if sorl_settings.THUMBNAIL_PRESERVE_FORMAT:
+        options.setdefault('format', backend._get_format(source))
+    for name, value in backend.default_options.items():
+        options.setdefault(name, value)
+    for name, attr in backend.extra_options:
+        value = getattr(sorl_settings, attr)
+        if value != getattr(sorl_defaults, attr):
+            options.setdefault(name, value)
+    thumbnail = ImageFile(
+        backend._get_thumbnail_filename(source, geometry, options),
+        default.storage)
+    return add_prefix(thumbnail.key)
+
+
+def prefetch_thumbnails(images):
+    """Разом подгружает миниатюры картинок во всех размерах из настроек."""
+    if not hasattr(default.kvstore, 'prefetch'):
+        return
+    default.kvstore.prefetch([
+        thumbnail_key(image, geometry, options)
+        for image in images if image
+        for geometry, options in THUMBNAIL_GEOMETRIES
+    ])
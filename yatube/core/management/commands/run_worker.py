@@ -0,0 +1,53 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from django.utils.module_loading import autodiscover_modules
+
+from core.tasks import claim, execute
+from yatube.settings import TASK_WORKERS
+
+
+class Command(BaseCommand):
+    help = 'Выполняет фоновые задачи из очереди в базе.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=TASK_WORKERS,
+            help='Сколько задач выполнять одновременно; '
+                 '0 — по одной в текущем потоке.')
+        parser.add_argument(
+            '--poll', type=float, default=1,
+            help='Сколько секунд ждать, когда очередь пуста.')
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Выполнить готовые задачи и выйти.')
+
+    def handle(self, *args, workers, poll, once, **options):
+        # Задачи регистрируются при импорте модулей tasks приложений.
+        autodiscover_modules('tasks')
+        pool = ThreadPoolExecutor(workers) if workers else None
+        # С --once повторы, отложенные во время прохода, ждут следующего.
+        due = timezone.now() if once else None
+        done = failed = 0
+        try:
+            while True:
+                jobs = claim(max(workers, 1) * 2, due)
+                if not jobs:
+                    if once:
+                        break
+                    time.sleep(poll)
+                    continue
+                results = (map(execute, jobs) if pool is None
+                           else pool.map(execute, jobs))
+                for result in results:
+                    done += result
+                    failed += not result
+                if not once:
+                    self.stdout.write(
+                        f'Выполнено: {done}, с ошибками: {failed}')
+        finally:
+            if pool is not None:
+                pool.shutdown()
+        self.stdout.write(f'Выполнено: {done}, с ошибками: {failed}')
@@ -0,0 +1,134 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.signals import apply_pragmas
+from yatube.settings import DB_PROFILES
+
+SCHEMA = [
+    'CREATE TABLE post (id INTEGER PRIMARY KEY, text TEXT, pub_date REAL)',
+    'CREATE INDEX post_pub_date ON post (pub_date)',
+]
+SEED_ROWS = 1000
+
+
+class Worker(threading.Thread):
+    """Читает ленту или пишет посты, пока не выйдет время."""
+
+    def __init__(self, path, profile, writer, deadline):
+        super().__init__()
+        self.path = path
+        self.profile = profile
+        self.writer = writer
+        self.deadline = deadline
+        self.operations = 0
+        self.locked = 0
+        self.connection = None
+
+    def connect(self):
+        # Без CONN_MAX_AGE Django открывает соединение на каждый запрос.
+        if self.connection is None or not self.profile['CONN_MAX_AGE']:
+            if self.connection is not None:
+                self.connection.close()
+            self.connection = sqlite3.connect(
+                self.path, timeout=self.profile['TIMEOUT'],
+                isolation_level=None)
+            apply_pragmas(self.connection.cursor(), self.profile['PRAGMAS'])
+        return self.connection
+
+    def operation(self, connection):
+        connection.execute('BEGIN')
+        try:
+            if self.writer:
+                connection.execute(
+                    'INSERT INTO post (text, pub_date) VALUES (?, ?)',
+                    ('Новый пост', time.time()))
+            else:
+                connection.execute(
+                    'SELECT * FROM post ORDER BY pub_date DESC LIMIT 10'
+                ).fetchall()
+                connection.execute('SELECT COUNT(*) FROM post').fetchone()
+            connection.execute('COMMIT')
+        except sqlite3.OperationalError:
+            connection.execute('ROLLBACK')
+            raise
+
+    def run(self):
+        while time.monotonic() < self.deadline:
+            try:
+                self.operation(self.connect())
+                self.operations += 1
+            except sqlite3.OperationalError as error:
+                if 'locked' not in str(error):
+                    raise
+                self.locked += 1
+        if self.connection is not None:
+            self.connection.close()
+
+
+class Command(BaseCommand):
+    help = ('Нагружает файл SQLite параллельными чтениями и записями '
+            'в каждом профиле и сравнивает пропускную способность.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--readers', type=int, default=6)
+        parser.add_argument('--writers', type=int, default=2)
+        parser.add_argument('--seconds', type=float, default=5)
+        parser.add_argument(
+            '--profile', action='append', choices=DB_PROFILES,
+            help='Какие профили сравнивать; по умолчанию все.')
+
+    def handle(self, *args, readers, writers, seconds, profile, **options):
+        self.stdout.write(
+            f'{"профиль":<12}{"чтений/с":>10}{"записей/с":>11}'
+            f'{"блокировок":>12}')
+        results = {}
+        for name in profile or DB_PROFILES:
+            result = results[name] = self.stress(
+                DB_PROFILES[name], readers, writers, seconds)
+            self.stdout.write(
+                f'{name:<12}{result["reads"] / seconds:>10.0f}'
+                f'{result["writes"] / seconds:>11.0f}{result["locked"]:>12}')
+        # Остальные профили сравниваются с первым.
+        base_name, *names = results
+        base = results[base_name]
+        for name in names:
+            result = results[name]
+            self.stdout.write(
+                f'{name} против {base_name}: '
+                f'чтений ×{result["reads"] / max(base["reads"], 1):.1f}, '
+                f'записей ×{result["writes"] / max(base["writes"], 1):.1f}, '
+                f'блокировок {result["locked"] - base["locked"]:+d}')
+
+    def stress(self, profile, readers, writers, seconds):
+        folder = tempfile.mkdtemp()
+        try:
+            path = os.path.join(folder, 'stress.sqlite3')
+            with sqlite3.connect(path) as connection:
+                for statement in SCHEMA:
+                    connection.execute(statement)
+                connection.executemany(
+                    'INSERT INTO post (text, pub_date) VALUES (?, ?)',
+                    (('Пост', number) for number in range(SEED_ROWS)))
+            connection.close()
+            deadline = time.monotonic() + seconds
+            workers = [
+                Worker(path, profile, writer, deadline)
+                for writer in [False] * readers + [True] * writers
+            ]
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+        finally:
+            shutil.rmtree(folder, ignore_errors=True)
+        return {
+            'reads': sum(w.operations for w in workers if not w.writer),
+            'writes': sum(w.operations for w in workers if w.writer),
+            'locked': sum(w.locked for w in workers),
+        }
@@ -0,0 +1,46 @@
+import sqlite3
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from core.cache import generation
+from core.db_routers import mark_synced
+from yatube.settings import DATABASES, REPLICA_DATABASES
+
+
+class Command(BaseCommand):
+    help = ('Копирует основную базу SQLite в файлы реплик — замена '
+            'настоящей репликации для локальной разработки.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'paths', nargs='*',
+            help='Файлы реплик; по умолчанию реплики из настроек.')
+        parser.add_argument(
+            '--interval', type=float, default=0,
+            help='Повторять копирование с этим интервалом в секундах.')
+
+    def handle(self, *args, paths, interval, **options):
+        paths = paths or [
+            DATABASES[alias]['NAME'] for alias in REPLICA_DATABASES]
+        while True:
+            self.sync(paths)
+            if not interval:
+                return
+            time.sleep(interval)
+
+    def sync(self, paths):
+        # Поколение берётся до копирования: всё, что его сдвинуло,
+        # уже записано в базу и попадёт в копию.
+        current = generation()
+        source = connections['default']
+        source.ensure_connection()
+        for path in paths:
+            target = sqlite3.connect(path)
+            try:
+                source.connection.backup(target)
+            finally:
+                target.close()
+        mark_synced(current)
+        self.stdout.write(f'Реплик обновлено: {len(paths)}')
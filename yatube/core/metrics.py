@@ -0,0 +1,231 @@
+import fcntl
+import glob
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import defaultdict
+
+from yatube.settings import METRICS_DIR, METRICS_FLUSH_INTERVAL
+
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+SIZE_BUCKETS = (1000, 5000, 10000, 50000, 100000, 500000, 1000000)
+
+METRICS = {
+    'yatube_requests_total': (
+        'counter', 'Обработанные запросы.', None),
+    'yatube_request_duration_seconds': (
+        'histogram', 'Время ответа.', LATENCY_BUCKETS),
+    'yatube_db_queries': (
+        'histogram', 'Запросы к базе на один ответ.', QUERY_BUCKETS),
+    'yatube_response_size_bytes': (
+        'histogram', 'Размер тела ответа.', SIZE_BUCKETS),
+    'yatube_page_cache_total': (
+        'counter', 'Обращения к кэшу страниц по результату.', None),
+}
+
+# Счётчики процесса, общие для всех его потоков.
+values = {}
+values_lock = threading.Lock()
+last_flush = 0.0
+
+
+def inc(name, labels, value=1):
+    key = (name, labels)
+    with values_lock:
+        values[key] = values.get(key, 0) + value
+
+
+def observe(name, labels, value):
+    key = (name, labels)
+    buckets = METRICS[name][2]
+    with values_lock:
+        counts = values.get(key)
+        if counts is None:
+            # Число попаданий в каждую корзину, затем в +Inf, затем сумма.
+            counts = values[key] = [0] * (len(buckets) + 2)
+        for index, bound in enumerate(buckets):
+            if value <= bound:
+                counts[index] += 1
+                break
+        else:
+            counts[-2] += 1
+        counts[-1] += value
+
+
+def merge(total, key, value):
+    if isinstance(value, list):
+        counts = total.get(key)
+        if counts is None:
+            total[key] = list(value)
+        else:
+            for index, item in enumerate(value):
+                counts[index] += item
+    else:
+        total[key] = total.get(key, 0) + value
+
+
+def snapshot():
+    """Копия счётчиков процесса."""
+    total = {}
+    with values_lock:
+        for key, value in values.items():
+            merge(total, key, value)
+    return total
+
+
+def snapshot_path(pid):
+    return os.path.join(METRICS_DIR, f'{pid}.json')
+
+
+def exited_path():
+    """Сумма счётчиков завершившихся процессов."""
+    return os.path.join(METRICS_DIR, 'exited.json')
+
+
+def read_snapshot(path):
+    try:
+        with open(path) as source:
+            data = json.load(source)
+    except (OSError, ValueError):
+        return {}
+    return {(name, tuple(tuple(pair) for pair in labels)): value
+            for name, labels, value in data}
+
+
+def write_snapshot(path, values):
+    data = [[name, labels, value] for (name, labels), value in values.items()]
+    handle, temporary = tempfile.mkstemp(dir=METRICS_DIR, suffix='.tmp')
+    with os.fdopen(handle, 'w') as output:
+        json.dump(data, output)
+    os.replace(temporary, path)
+
+
+def flush(force=False):
+    """Сохраняет счётчики процесса в общий каталог, но не чаще интервала."""
+    global last_flush
+    now = time.monotonic()
+    if not METRICS_DIR or (not force
+                           and now - last_flush < METRICS_FLUSH_INTERVAL):
+        return
+    last_flush = now
+    os.makedirs(METRICS_DIR, exist_ok=True)
+    write_snapshot(snapshot_path(os.getpid()), snapshot())
+
+
+def is_running(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # Процесс есть, но принадлежит другому пользователю.
+        return True
+    return True
+
+
+def fold_exited(path):
+    """Переносит счётчики завершившегося процесса в общий файл exited.json.
+
+    Просто удалить файл нельзя: сумма уменьшится, и rate() в Prometheus
+    примет это за сброс счётчика и покажет всплеск.
+    """
+    with open(os.path.join(METRICS_DIR, 'lock'), 'a') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            # Другой процесс мог уже перенести этот файл.
+            if not os.path.exists(path):
+                return
+            total = read_snapshot(exited_path())
+            for key, value in read_snapshot(path).items():
+                merge(total, key, value)
+            write_snapshot(exited_path(), total)
+            os.remove(path)
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def collect():
+    """Счётчики текущего процесса вместе с сохранёнными другими воркерами."""
+    total = snapshot()
+    if not METRICS_DIR:
+        return total
+    own = snapshot_path(os.getpid())
+    for path in glob.glob(os.path.join(METRICS_DIR, '*.json')):
+        pid = os.path.basename(path)[:-len('.json')]
+        if pid.isdigit() and path != own and not is_running(int(pid)):
+            fold_exited(path)
+    for path in glob.glob(os.path.join(METRICS_DIR, '*.json')):
+        if path == own:
+            continue
+        for key, value in read_snapshot(path).items():
+            merge(total, key, value)
+    return total
+
+
+def escape(value):
+    return (str(value).replace('\\', r'\\').replace('"', r'\"')
+            .replace('\n', r'\n'))
+
+
+def format_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(
+        f'{name}="{escape(value)}"' for name, value in pairs) + '}'
+
+
+def render():
+    """Все метрики в текстовом формате Prometheus."""
+    series = defaultdict(list)
+    for (name, labels), value in sorted(collect().items()):
+        series[name].append((labels, value))
+    lines = []
+    for name, (kind, help_text, buckets) in METRICS.items():
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {kind}')
+        for labels, value in series[name]:
+            if kind == 'counter':
+                lines.append(f'{name}{format_labels(labels)} {value}')
+                continue
+            cumulative = 0
+            for bound, count in zip(buckets + ('+Inf',), value[:-1]):
+                cumulative += count
+                lines.append(f'{name}_bucket'
+                             f'{format_labels(labels, [("le", bound)])} '
+                             f'{cumulative}')
+            lines.append(f'{name}_sum{format_labels(labels)} {value[-1]}')
+            lines.append(f'{name}_count{format_labels(labels)} {cumulative}')
+    return '\n'.join(lines) + '\n'
+
+
+def collect_metrics(get_response):
+    """Записывает метрики каждого ответа с меткой имени маршрута."""
+
+    def middleware(request):
+        started = time.perf_counter()
+        response = get_response(request)
+        elapsed = time.perf_counter() - started
+        match = request.resolver_match
+        view = (('view', match.view_name if match else 'unresolved'),)
+        inc('yatube_requests_total', view + (
+            ('method', request.method),
+            ('status', str(response.status_code)),
+        ))
+        observe('yatube_request_duration_seconds', view, elapsed)
+        stats = getattr(request, 'query_stats', None)
+        if not response.streaming:
+            if stats is not None:
+                observe('yatube_db_queries', view, stats.count)
+            observe('yatube_response_size_bytes', view, len(response.content))
+        outcome = getattr(request, 'page_cache', None)
+        if outcome is not None:
+            inc('yatube_page_cache_total', view + (('result', outcome),))
+        flush()
+        return response
+
+    return middleware
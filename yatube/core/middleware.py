@@ -0,0 +1,104 @@
+import logging
+import time
+from contextlib import ExitStack
+
+from django.db import connections
+
+from yatube.settings import (QUERY_BUDGET, QUERY_TIME_BUDGET,
+                             REPLICA_DATABASES, REPLICA_PIN_SECONDS)
+
+from . import db_routers
+from .cache import generation
+
+logger = logging.getLogger(__name__)
+
+PIN_COOKIE = 'primary_db'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+class QueryStats:
+    """Считает запросы к базе, их общее время и самый медленный из них."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.slowest = 0.0
+        self.slowest_sql = ''
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.count += 1
+            self.duration += elapsed
+            if elapsed > self.slowest:
+                self.slowest = elapsed
+                self.slowest_sql = sql
+
+
+def query_stats(get_response):
+    """Добавляет к ответу Server-Timing и пишет в лог слишком дорогие запросы.
+
+    В отличие от DEBUG=True запросы не копятся в памяти, поэтому
+    промежуточный слой можно оставлять включённым в продакшене.
+    """
+
+    def middleware(request):
+        stats = request.query_stats = QueryStats()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(stats))
+            response = get_response(request)
+        if response.streaming:
+            # Запросы потокового ответа выполняются уже после отправки
+            # заголовков, сосчитать их для Server-Timing нельзя.
+            return response
+        total = time.perf_counter() - started
+        response['Server-Timing'] = (
+            f'db;desc="{stats.count} queries";'
+            f'dur={stats.duration * 1000:.2f}, '
+            f'db-slowest;dur={stats.slowest * 1000:.2f}, '
+            f'total;dur={total * 1000:.2f}'
+        )
+        if stats.count > QUERY_BUDGET or total > QUERY_TIME_BUDGET:
+            logger.warning(
+                '%s %s: %d запросов за %.1f мс, всего %.1f мс, '
+                'самый медленный (%.1f мс): %s',
+                request.method, request.path, stats.count,
+                stats.duration * 1000, total * 1000,
+                stats.slowest * 1000, stats.slowest_sql,
+            )
+        return response
+
+    return middleware
+
+
+def replica_reads(get_response):
+    """Разрешает читать реплики, если это не нарушит read-your-writes.
+
+    После записи пользователь получает куку и на время REPLICA_PIN_SECONDS
+    читает только основную базу. Реплики, отставшие от поколения кэша
+    страниц, не используются вовсе, чтобы в кэш не попали старые данные.
+    """
+
+    def middleware(request):
+        safe = request.method in SAFE_METHODS
+        db_routers.state.wrote = False
+        db_routers.state.replicas = bool(
+            REPLICA_DATABASES and safe
+            and PIN_COOKIE not in request.COOKIES
+            and db_routers.replicas_fresh(generation()))
+        try:
+            response = get_response(request)
+        finally:
+            wrote = db_routers.state.wrote or not safe
+            db_routers.state.replicas = False
+        if wrote and REPLICA_DATABASES:
+            response.set_cookie(
+                PIN_COOKIE, '1', max_age=REPLICA_PIN_SECONDS, httponly=True)
+        return response
+
+    return middleware
@@ -0,0 +1,38 @@
+from django.db import models
+from django.utils import timezone
+
+
+class Task(models.Model):
+    PENDING = 'pending'
+    RUNNING = 'running'
+    FAILED = 'failed'
+    STATUSES = (
+        (PENDING, 'В очереди'),
+        (RUNNING, 'Выполняется'),
+        (FAILED, 'Не выполнена'),
+    )
+
+    name = models.CharField(max_length=200, verbose_name='Задача')
+    arguments = models.TextField(verbose_name='Аргументы в JSON')
+    status = models.CharField(
+        max_length=10, choices=STATUSES, default=PENDING,
+        verbose_name='Состояние'
+    )
+    attempts = models.PositiveSmallIntegerField(
+        default=0, verbose_name='Попыток')
+    run_at = models.DateTimeField(
+        default=timezone.now, verbose_name='Запустить не раньше')
+    started = models.DateTimeField(
+        null=True, blank=True, verbose_name='Начата')
+    error = models.TextField(blank=True, verbose_name='Последняя ошибка')
+
+    class Meta:
+        indexes = [
+            models.Index(fields=('status', 'run_at'),
+                         name='task_status_run_at'),
+        ]
+        verbose_name = 'Фоновая задача'
+        verbose_name_plural = 'Фоновые задачи'
+
+    def __str__(self):
+        return self.name
@@ -0,0 +1,18 @@
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+from yatube.settings import DB_PROFILE, DB_PROFILES
+
+
+def apply_pragmas(cursor, pragmas):
+    for name, value in pragmas.items():
+        cursor.execute(f'PRAGMA {name} = {value}')
+
+
+@receiver(connection_created)
+def tune_sqlite(sender, connection, **kwargs):
+    """Настраивает каждое новое соединение SQLite по профилю из настроек."""
+    pragmas = DB_PROFILES[DB_PROFILE]['PRAGMAS']
+    if connection.vendor == 'sqlite' and pragmas:
+        with connection.cursor() as cursor:
+            apply_pragmas(cursor, pragmas)
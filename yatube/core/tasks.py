@@ -0,0 +1,115 @@
+import json
+import logging
+import traceback
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db import close_old_connections
+from django.db.models import F
+from django.utils import timezone
+
+from yatube.settings import (TASK_BACKLOG_AGE, TASK_BACKLOG_CHECK_INTERVAL,
+                             TASK_RETRIES, TASK_RETRY_DELAY, TASK_TIMEOUT,
+                             TASKS_EAGER)
+
+from .models import Task
+
+logger = logging.getLogger(__name__)
+
+BACKLOG_CHECKED_KEY = 'tasks:backlog-checked'
+
+registry = {}
+
+
+class TaskFunction:
+    """Функция, которую можно вызвать сразу или отложить через delay()."""
+
+    def __init__(self, func, retries, retry_delay):
+        self.func = func
+        self.name = f'{func.__module__}.{func.__qualname__}'
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self.__doc__ = func.__doc__
+        registry[self.name] = self
+
+    def __call__(self, *args, **kwargs):
+        return self.func(*args, **kwargs)
+
+    def delay(self, *args, **kwargs):
+        """Ставит вызов в очередь в той же транзакции, что и данные.
+
+        В режиме TASKS_EAGER, включённом в тестах, выполняет его сразу.
+        """
+        if TASKS_EAGER:
+            return self.func(*args, **kwargs)
+        job = Task.objects.create(
+            name=self.name,
+            arguments=json.dumps({'args': args, 'kwargs': kwargs}))
+        check_backlog()
+        return job
+
+
+def check_backlog():
+    """Предупреждает, что готовые задачи давно никто не выполняет."""
+    if not cache.add(BACKLOG_CHECKED_KEY, True, TASK_BACKLOG_CHECK_INTERVAL):
+        return
+    waiting = Task.objects.filter(
+        status=Task.PENDING,
+        run_at__lt=timezone.now() - timedelta(seconds=TASK_BACKLOG_AGE),
+    ).count()
+    if waiting:
+        logger.warning(
+            'Задач, ждущих дольше %d с: %d. Запущен ли manage.py run_worker?',
+            TASK_BACKLOG_AGE, waiting)
+
+
+def task(func=None, *, retries=TASK_RETRIES, retry_delay=TASK_RETRY_DELAY):
+    """Регистрирует функцию как фоновую задачу."""
+    if func is None:
+        return lambda func: TaskFunction(func, retries, retry_delay)
+    return TaskFunction(func, retries, retry_delay)
+
+
+def claim(limit, due=None):
+    """Забирает до limit задач, готовых к due, чтобы их не взял другой."""
+    now = timezone.now()
+    due = due or now
+    # Задачи упавшего воркера возвращаются в очередь.
+    Task.objects.filter(
+        status=Task.RUNNING, started__lt=now - timedelta(seconds=TASK_TIMEOUT)
+    ).update(status=Task.PENDING)
+    ids = Task.objects.filter(
+        status=Task.PENDING, run_at__lte=due
+    ).order_by('run_at', 'id').values_list('id', flat=True)[:limit]
+    claimed = [
+        pk for pk in list(ids)
+        if Task.objects.filter(pk=pk, status=Task.PENDING).update(
+            status=Task.RUNNING, started=now, attempts=F('attempts') + 1)
+    ]
+    return list(Task.objects.filter(pk__in=claimed).order_by('run_at', 'id'))
+
+
+def execute(job):
+    """Выполняет забранную задачу; при ошибке откладывает повтор."""
+    close_old_connections()
+    try:
+        function = registry[job.name]
+        arguments = json.loads(job.arguments)
+        function.func(*arguments['args'], **arguments['kwargs'])
+    except Exception:
+        logger.exception('Задача %s #%s упала', job.name, job.pk)
+        function = registry.get(job.name)
+        changes = {'status': Task.FAILED, 'error': traceback.format_exc()}
+        if function is not None and job.attempts <= function.retries:
+            changes.update(
+                status=Task.PENDING,
+                run_at=timezone.now() + timedelta(
+                    seconds=function.retry_delay * 2 ** (job.attempts - 1)),
+            )
+        Task.objects.filter(pk=job.pk).update(**changes)
+        return False
+    else:
+        Task.objects.filter(pk=job.pk).delete()
+        return True
+    finally:
+        close_old_connections()
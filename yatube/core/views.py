@@ -1,5 +1,10 @@
+from django.http import HttpResponse, HttpResponseForbidden
 from django.shortcuts import render
 
+from yatube.settings import METRICS_ALLOWED_IPS
+
+from . import metrics as metrics_registry
+
 
 def page_not_found(request, exception):
     return render(request, 'core/404.html', {'path': request.path}, status=404)
@@ -11,3 +16,12 @@ def csrf_failure(request, reason=''):
 
 def server_error(request):
     return render(request, 'core/500.html', status=500)
+
+
+def metrics(request):
+    if (not request.user.is_staff
+            and request.META.get('REMOTE_ADDR') not in METRICS_ALLOWED_IPS):
+        return HttpResponseForbidden()
+    return HttpResponse(
+        metrics_registry.render(),
+        content_type='text/plain; version=0.0.4; charset=utf-8')
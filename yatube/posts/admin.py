@@ -1,6 +1,8 @@
 from django.contrib import admin
+from django.contrib.admin.views.main import SEARCH_VAR
 
-from .models import Post, Group, Comment, Follow
+from .models import Post, Group, Comment, Follow, Stats
+from .search import match_expression, search
 
 
 class PostAdmin(admin.ModelAdmin):
@@ -10,8 +12,21 @@ class PostAdmin(admin.ModelAdmin):
     list_filter = ("pub_date",)
     empty_value_display = "-пусто-"
 
+    def get_ordering(self, request):
+        # Список изменений пересортировывает результат поиска по своему
+        # порядку, поэтому ранг нужно вернуть и отсюда.
+        if match_expression(request.GET.get(SEARCH_VAR, '')):
+            return ('search_index__rank', '-pub_date')
+        return super().get_ordering(request)
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term:
+            return queryset, False
+        return search(queryset, search_term), False
+
 
 admin.site.register(Post, PostAdmin)
 admin.site.register(Group)
 admin.site.register(Comment)
 admin.site.register(Follow)
+admin.site.register(Stats)
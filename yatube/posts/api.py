@@ -0,0 +1,126 @@
+from functools import wraps
+
+from django.http import Http404, JsonResponse
+from django.shortcuts import get_object_or_404
+
+from core.cache import page_conditions, versioned_cache_page
+from yatube.settings import PAGE_CACHE_TIMEOUT, POSTS_ON_PAGE
+
+from .models import Group, Post, User
+from .paginators import CursorPaginator
+from .views import comments_page, feed
+
+POST_FIELDS = {
+    'id': lambda post: post.id,
+    'text': lambda post: post.text,
+    'pub_date': lambda post: post.pub_date,
+    'author': lambda post: post.author.username,
+    'author_posts_count': lambda post: post.author.stats.posts_count,
+    'group': lambda post: post.group.slug if post.group else None,
+    'image': lambda post: post.image.url if post.image else None,
+}
+COMMENT_FIELDS = {
+    'id': lambda comment: comment.id,
+    'text': lambda comment: comment.text,
+    'pub_date': lambda comment: comment.pub_date,
+    'author': lambda comment: comment.author.username,
+}
+
+
+class FieldsError(ValueError):
+    pass
+
+
+def api_response(data, status=200):
+    return JsonResponse(
+        data, status=status,
+        json_dumps_params={'ensure_ascii': False, 'separators': (',', ':')})
+
+
+def api_view(view):
+    """Отдаёт ошибки API в JSON, а не HTML-страницей."""
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        try:
+            return view(request, *args, **kwargs)
+        except Http404:
+            return api_response({'error': 'Не найдено'}, status=404)
+        except FieldsError as error:
+            return api_response({'error': str(error)}, status=400)
+    return wrapper
+
+
+def requested_fields(request):
+    """Поля из ?fields=id,text,author; без параметра — все."""
+    if not request.GET.get('fields'):
+        return list(POST_FIELDS)
+    fields = request.GET['fields'].split(',')
+    unknown = [name for name in fields if name not in POST_FIELDS]
+    if unknown:
+        raise FieldsError(f'Неизвестные поля: {", ".join(unknown)}')
+    return fields
+
+
+def serialize(obj, fields, getters):
+    return {name: getters[name](obj) for name in fields}
+
+
+def feed_response(queryset, request):
+    """Страница ленты с курсорами для следующей и предыдущей."""
+    fields = requested_fields(request)
+    page = CursorPaginator(feed(queryset), POSTS_ON_PAGE).get_page(
+        request.GET.get('cursor'))
+    return api_response({
+        'results': [serialize(post, fields, POST_FIELDS) for post in page],
+        'next': page.next_cursor,
+        'previous': page.previous_cursor,
+    })
+
+
+@api_view
+@page_conditions
+@versioned_cache_page(PAGE_CACHE_TIMEOUT, key_prefix='api_index')
+def index(request):
+    return feed_response(Post.objects.all(), request)
+
+
+@api_view
+@page_conditions
+@versioned_cache_page(PAGE_CACHE_TIMEOUT, key_prefix='api_group')
+def group_posts(request, slug):
+    group = get_object_or_404(Group, slug=slug)
+    return feed_response(group.posts.all(), request)
+
+
+@api_view
+@page_conditions
+@versioned_cache_page(PAGE_CACHE_TIMEOUT, key_prefix='api_profile')
+def profile(request, username):
+    author = get_object_or_404(User, username=username)
+    return feed_response(author.posts.all(), request)
+
+
+@api_view
+def follow_index(request):
+    if not request.user.is_authenticated:
+        return api_response({'error': 'Нужно войти'}, status=401)
+    return feed_response(Post.objects.filter(
+        timeline_entries__user=request.user
+    ).order_by('-timeline_entries__pub_date'), request)
+
+
+@api_view
+@page_conditions
+def post_detail(request, post_id):
+    fields = requested_fields(request)
+    post = get_object_or_404(feed(Post.objects.all()), pk=post_id)
+    comments = comments_page(post, request)
+    return api_response({
+        'post': serialize(post, fields, POST_FIELDS),
+        'comments': [
+            serialize(comment, COMMENT_FIELDS, COMMENT_FIELDS)
+            for comment in comments
+        ],
+        'next': comments.next_cursor,
+        'previous': comments.previous_cursor,
+    })
@@ -0,0 +1,46 @@
+import csv
+import json
+
+FIELDS = ('text', 'author', 'group', 'pub_date', 'image')
+# Столько строк за раз забирается из курсора базы.
+EXPORT_CHUNK = 2000
+CONTENT_TYPES = {
+    'ndjson': 'application/x-ndjson; charset=utf-8',
+    'csv': 'text/csv; charset=utf-8',
+}
+
+
+class Echo:
+    """Буфер для csv.writer, который сразу возвращает записанную строку."""
+
+    def write(self, value):
+        return value
+
+
+def records(queryset):
+    """Посты в формате import_posts от старых к новым, не держа их в памяти."""
+    rows = queryset.order_by('pub_date', 'id').values_list(
+        'text', 'author__username', 'group__slug', 'pub_date', 'image')
+    for text, author, group, pub_date, image in rows.iterator(EXPORT_CHUNK):
+        yield {
+            'text': text,
+            'author': author,
+            'group': group or '',
+            'pub_date': pub_date.isoformat(),
+            'image': image or '',
+        }
+
+
+def ndjson_lines(queryset):
+    for record in records(queryset):
+        yield json.dumps(record, ensure_ascii=False) + '\n'
+
+
+def csv_lines(queryset):
+    writer = csv.DictWriter(Echo(), FIELDS)
+    yield writer.writeheader()
+    for record in records(queryset):
+        yield writer.writerow(record)
+
+
+WRITERS = {'ndjson': ndjson_lines, 'csv': csv_lines}
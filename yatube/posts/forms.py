@@ -1,6 +1,6 @@
 from django import forms
 
-from .models import Post, Comment
+from .models import Comment, Group, Post
 
 
 class PostForm(forms.ModelForm):
@@ -13,3 +13,14 @@ class CommentForm(forms.ModelForm):
     class Meta:
         model = Comment
         fields = ('text',)
+
+
+class SearchForm(forms.Form):
+    q = forms.CharField(label='Текст', required=False)
+    group = forms.ModelChoiceField(
+        Group.objects.all(),
+        to_field_name='slug',
+        label='Группа',
+        required=False,
+    )
+    author = forms.CharField(label='Автор', required=False)
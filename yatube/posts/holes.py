@@ -0,0 +1,44 @@
+from django.template.loader import render_to_string
+
+from core.holes import register
+
+from .forms import CommentForm
+from .models import Follow
+
+
+@register('switcher')
+def switcher(request, active):
+    if not request.user.is_authenticated:
+        return ''
+    return render_to_string(
+        'posts/includes/switcher.html', {active: True}, request)
+
+
+@register('follow_button')
+def follow_button(request, author_id, username):
+    user = request.user
+    if not user.is_authenticated or user.pk == author_id:
+        return ''
+    return render_to_string('posts/includes/follow_button.html', {
+        'username': username,
+        'following': Follow.objects.filter(
+            user=user, author_id=author_id).exists(),
+    }, request)
+
+
+@register('edit_button')
+def edit_button(request, post_id, author_id):
+    if request.user.pk != author_id:
+        return ''
+    return render_to_string(
+        'posts/includes/edit_button.html', {'post_id': post_id}, request)
+
+
+@register('comment_form')
+def comment_form(request, post_id):
+    if not request.user.is_authenticated:
+        return ''
+    return render_to_string('posts/includes/comment_form.html', {
+        'post_id': post_id,
+        'form': CommentForm(),
+    }, request)
@@ -0,0 +1,237 @@
+import io
+import json
+import os
+import random
+import shutil
+import tempfile
+import time
+from datetime import datetime
+
+import django
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+
+from posts.models import Comment, Follow, Group, Post, User
+from yatube.settings import CACHES
+
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+PERCENTILES = (50, 95, 99)
+BATCH_SIZE = 500
+# Клиент ходит от имени хоста из ALLOWED_HOSTS, как настоящий браузер.
+HOST = 'localhost'
+
+
+def percentile(values, rank):
+    """Значение перцентиля по ближайшему рангу для отсортированного списка."""
+    index = max(0, -(-len(values) * rank // 100) - 1)
+    return values[index]
+
+
+def private_caches(location):
+    """Те же кэши, что в настройках, но в отдельном каталоге.
+
+    Иначе cache.clear() очистил бы кэш работающего сайта вместе с его
+    сессиями, а в нём остались бы записи из временной базы.
+    """
+    return {
+        'default': {**CACHES['default'], 'LOCATION': location},
+        'shared': {
+            **CACHES['shared'], 'LOCATION': os.path.join(location, 'data')},
+    }
+
+
+class Command(BaseCommand):
+    help = ('Заполняет базу тестовыми данными и замеряет скорость '
+            'основных страниц.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100)
+        parser.add_argument('--groups', type=int, default=10)
+        parser.add_argument('--posts', type=int, default=2000)
+        parser.add_argument('--comments', type=int, default=5000)
+        parser.add_argument(
+            '--follows', type=int, default=10,
+            help='На скольких авторов подписан каждый пользователь.')
+        parser.add_argument(
+            '--images', type=int, default=200,
+            help='Сколько постов получат картинку.')
+        parser.add_argument(
+            '--requests', type=int, default=200,
+            help='Сколько замеряемых запросов делать к каждой странице.')
+        parser.add_argument(
+            '--warmup', type=int, default=10,
+            help='Сколько запросов сделать до начала замеров.')
+        parser.add_argument(
+            '--cold', action='store_true',
+            help='Очищать кэш перед каждым запросом, чтобы мерить отрисовку.')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--output', default='bench.json',
+            help='Куда записать результаты в формате JSON.')
+        parser.add_argument(
+            '--use-current-db', action='store_true',
+            help='Работать с текущей базой, а не с отдельной тестовой.')
+
+    def handle(self, *args, **options):
+        self.random = random.Random(options['seed'])
+        old_name = None
+        if not options['use_current_db']:
+            old_name = connection.creation.create_test_db(
+                verbosity=0, autoclobber=True)
+        media_root = tempfile.mkdtemp()
+        cache_root = tempfile.mkdtemp()
+        try:
+            with override_settings(MEDIA_ROOT=media_root,
+                                   CACHES=private_caches(cache_root)):
+                self.seed(**options)
+                results = self.run(
+                    options['requests'], options['warmup'], options['cold'])
+        finally:
+            shutil.rmtree(media_root, ignore_errors=True)
+            shutil.rmtree(cache_root, ignore_errors=True)
+            if old_name is not None:
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+        report = {
+            'started': datetime.now().isoformat(timespec='seconds'),
+            'django': django.get_version(),
+            'database': connection.vendor,
+            'dataset': {
+                name: options[name] for name in (
+                    'users', 'groups', 'posts', 'comments', 'follows',
+                    'images', 'requests', 'warmup', 'cold', 'seed')
+            },
+            'views': results,
+        }
+        with open(options['output'], 'w') as output:
+            json.dump(report, output, indent=2, ensure_ascii=False)
+        self.print_report(results)
+        self.stdout.write(f'Результаты записаны в {options["output"]}')
+
+    def seed(self, users, groups, posts, comments, follows, images,
+             **options):
+        """Быстро заполняет базу пачечными вставками в обход сигналов."""
+        prefix = f'bench{int(time.time())}'
+        password = make_password('bench')
+        User.objects.bulk_create(
+            [User(username=f'{prefix}_{number}', password=password)
+             for number in range(users)], batch_size=BATCH_SIZE)
+        self.users = list(User.objects.filter(
+            username__startswith=f'{prefix}_'))
+        Group.objects.bulk_create(
+            [Group(title=f'Группа {number}', slug=f'{prefix}-{number}',
+                   description='Группа для замеров')
+             for number in range(groups)], batch_size=BATCH_SIZE)
+        self.groups = list(Group.objects.filter(
+            slug__startswith=f'{prefix}-'))
+        pictures = [
+            default_storage.save(f'posts/{prefix}_{number}.gif',
+                                 ContentFile(SMALL_GIF))
+            for number in range(min(images, 10))
+        ]
+        Post.objects.bulk_create(
+            [Post(text=f'Пост номер {number} ' + 'текст ' * 20,
+                  author=self.random.choice(self.users),
+                  group=self.random.choice(self.groups + [None]),
+                  image=(pictures[number % len(pictures)]
+                         if number < images else ''))
+             for number in range(posts)], batch_size=BATCH_SIZE)
+        self.posts = list(Post.objects.filter(
+            author__in=self.users).values_list('pk', flat=True))
+        Comment.objects.bulk_create(
+            [Comment(text=f'Комментарий {number}',
+                     author=self.random.choice(self.users),
+                     post_id=self.random.choice(self.posts))
+             for number in range(comments)], batch_size=BATCH_SIZE)
+        Follow.objects.bulk_create(
+            [Follow(user=user, author=author)
+             for user in self.users
+             for author in self.random.sample(
+                 [other for other in self.users if other != user],
+                 min(follows, users - 1))], batch_size=BATCH_SIZE)
+        # Вставки пачками не вызывают сигналы: счётчики и ленты собираем
+        # теми же командами, что чинят их в рабочей базе.
+        silent = io.StringIO()
+        call_command('recount_stats', stdout=silent)
+        call_command('rebuild_timelines', stdout=silent)
+
+    def scenarios(self):
+        """Страницы для замеров: имя, метод, адрес, данные и нужен ли вход."""
+        yield 'index', 'get', lambda: reverse('posts:index'), None, False
+        yield 'group_posts', 'get', lambda: reverse(
+            'posts:group_list',
+            args=[self.random.choice(self.groups).slug]), None, False
+        yield 'profile', 'get', lambda: reverse(
+            'posts:profile',
+            args=[self.random.choice(self.users).username]), None, False
+        yield 'post_detail', 'get', lambda: reverse(
+            'posts:post_detail',
+            args=[self.random.choice(self.posts)]), None, False
+        yield 'follow_index', 'get', lambda: reverse(
+            'posts:follow_index'), None, True
+        yield 'post_create', 'post', lambda: reverse(
+            'posts:post_create'), {'text': 'Новый пост'}, True
+        yield 'add_comment', 'post', lambda: reverse(
+            'posts:add_comment',
+            args=[self.random.choice(self.posts)]), {'text': 'Ещё'}, True
+
+    def run(self, requests, warmup, cold):
+        cache.clear()
+        guest = Client(HTTP_HOST=HOST)
+        member = Client(HTTP_HOST=HOST)
+        member.force_login(self.random.choice(self.users))
+        results = {}
+        for name, method, url, data, login in self.scenarios():
+            client = member if login else guest
+            send = getattr(client, method)
+            for _ in range(warmup):
+                send(url(), data)
+            timings, queries = [], []
+            started = time.perf_counter()
+            for _ in range(requests):
+                address = url()
+                if cold:
+                    cache.clear()
+                with CaptureQueriesContext(connection) as context:
+                    begin = time.perf_counter()
+                    response = send(address, data)
+                    timings.append((time.perf_counter() - begin) * 1000)
+                if response.status_code >= 400:
+                    self.stderr.write(
+                        f'{name}: {address} ответил {response.status_code}')
+                queries.append(len(context.captured_queries))
+            elapsed = time.perf_counter() - started
+            timings.sort()
+            results[name] = {
+                'requests': requests,
+                **{f'p{rank}_ms': round(percentile(timings, rank), 3)
+                   for rank in PERCENTILES},
+                'mean_ms': round(sum(timings) / requests, 3),
+                'queries_mean': round(sum(queries) / requests, 2),
+                'queries_max': max(queries),
+                'queries_per_second': round(sum(queries) / elapsed, 1),
+                'requests_per_second': round(requests / elapsed, 1),
+            }
+        return results
+
+    def print_report(self, results):
+        header = ('страница', 'p50', 'p95', 'p99', 'запросов', 'запр/с')
+        self.stdout.write('{:<14}{:>9}{:>9}{:>9}{:>10}{:>10}'.format(*header))
+        for name, row in results.items():
+            self.stdout.write('{:<14}{:>9}{:>9}{:>9}{:>10}{:>10}'.format(
+                name, row['p50_ms'], row['p95_ms'], row['p99_ms'],
+                row['queries_mean'], row['queries_per_second']))
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.export import WRITERS
+from posts.models import Group, Post, User
+
+
+class Command(BaseCommand):
+    help = ('Выгружает посты группы или автора в NDJSON или CSV '
+            'в формате import_posts.')
+
+    def add_arguments(self, parser):
+        source = parser.add_mutually_exclusive_group()
+        source.add_argument('--group', help='Адрес группы.')
+        source.add_argument('--author', help='Имя автора.')
+        parser.add_argument(
+            '--format', choices=WRITERS, default='ndjson', dest='file_format')
+        parser.add_argument(
+            '--output', help='Файл для выгрузки; по умолчанию stdout.')
+
+    def handle(self, *args, group, author, file_format, output, **options):
+        posts = Post.objects.all()
+        if group:
+            try:
+                posts = Group.objects.get(slug=group).posts.all()
+            except Group.DoesNotExist:
+                raise CommandError(f'Нет группы {group!r}')
+        elif author:
+            try:
+                posts = User.objects.get(username=author).posts.all()
+            except User.DoesNotExist:
+                raise CommandError(f'Нет автора {author!r}')
+        lines = WRITERS[file_format](posts)
+        if output is None:
+            for line in lines:
+                self.stdout.write(line, ending='')
+            return
+        with open(output, 'w', newline='', encoding='utf-8') as target:
+            target.writelines(lines)
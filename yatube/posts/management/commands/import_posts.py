@@ -0,0 +1,188 @@
+import csv
+import json
+import os
+from collections import Counter
+from contextlib import contextmanager
+from itertools import islice
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from core.cache import bump_generation
+from posts import timeline
+from posts.models import Group, ImportProgress, Post, User
+from posts.signals import change_stats
+
+# Столько имён авторов и адресов групп держим в памяти между пачками.
+LOOKUP_CACHE_SIZE = 10000
+
+
+def read_ndjson(source):
+    """Запись на каждую строку, чтобы номер записи совпадал с номером строки.
+
+    Пустая строка даёт None, неразобранная — CommandError вместо записи.
+    """
+    for line in source:
+        if not line.strip():
+            yield None
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError as error:
+            yield CommandError(f'неверный JSON: {error}')
+
+
+def read_csv(source):
+    yield from csv.DictReader(source)
+
+
+READERS = {'ndjson': read_ndjson, 'csv': read_csv}
+
+
+@contextmanager
+def keep_pub_date():
+    """Даёт сохранить дату публикации из файла вместо текущего времени."""
+    field = Post._meta.get_field('pub_date')
+    field.auto_now_add = False
+    try:
+        yield
+    finally:
+        field.auto_now_add = True
+
+
+class Lookup:
+    """Пачкой находит id объектов по ключу и помнит уже найденные."""
+
+    def __init__(self, queryset, field):
+        self.queryset = queryset
+        self.field = field
+        self.known = {}
+
+    def resolve(self, values):
+        values = set(values)
+        missing = {value for value in values if value not in self.known}
+        if len(self.known) + len(missing) > LOOKUP_CACHE_SIZE:
+            self.known.clear()
+            missing = values
+        self.known.update({value: None for value in missing})
+        self.known.update(self.queryset.filter(
+            **{f'{self.field}__in': missing}).values_list(self.field, 'pk'))
+
+    def __getitem__(self, value):
+        return self.known.get(value)
+
+
+class Command(BaseCommand):
+    help = 'Загружает посты из файла NDJSON или CSV пачками.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path',
+            help='Файл с полями text, author, group, pub_date и image.')
+        parser.add_argument(
+            '--format', choices=READERS, dest='file_format',
+            help='Формат файла; по умолчанию определяется по расширению.')
+        parser.add_argument(
+            '--batch-size', type=int, default=5000,
+            help='Сколько постов вставлять за одну транзакцию.')
+        parser.add_argument(
+            '--checkpoint',
+            help='Имя, под которым в базе хранится число уже загруженных '
+                 'записей для продолжения после сбоя; по умолчанию полный '
+                 'путь к файлу.')
+
+    def handle(self, *args, path, file_format, batch_size, checkpoint,
+               **options):
+        file_format = file_format or (
+            'csv' if path.lower().endswith('.csv') else 'ndjson')
+        progress, _ = ImportProgress.objects.get_or_create(
+            source=checkpoint or os.path.abspath(path))
+        done = progress.records
+        if done:
+            self.stdout.write(f'Продолжаем с записи {done + 1}')
+        self.authors = Lookup(User.objects.all(), 'username')
+        self.groups = Lookup(Group.objects.all(), 'slug')
+        imported = skipped = 0
+        with open(path, newline='', encoding='utf-8') as source, \
+                keep_pub_date():
+            records = islice(READERS[file_format](source), done, None)
+            while True:
+                batch = list(islice(records, batch_size))
+                if not batch:
+                    break
+                with transaction.atomic():
+                    posts = self.build(batch, first=done + 1)
+                    self.insert(posts)
+                    done += len(batch)
+                    # В той же транзакции, что и посты: после сбоя пачка
+                    # не загрузится повторно.
+                    ImportProgress.objects.filter(pk=progress.pk).update(
+                        records=done)
+                imported += len(posts)
+                skipped += sum(
+                    record is not None for record in batch) - len(posts)
+                self.stdout.write(
+                    f'Загружено постов: {imported}, пропущено: {skipped}')
+        progress.delete()
+        bump_generation()
+        self.stdout.write(f'Готово: {imported}, пропущено: {skipped}')
+
+    def build(self, batch, first):
+        records = [record for record in batch if isinstance(record, dict)]
+        self.authors.resolve(record.get('author') for record in records)
+        self.groups.resolve(
+            record.get('group') for record in records if record.get('group'))
+        posts = []
+        for number, record in enumerate(batch, first):
+            if record is None:
+                continue
+            try:
+                posts.append(self.build_post(record))
+            except CommandError as error:
+                self.stderr.write(f'Запись {number}: {error}')
+        return posts
+
+    def build_post(self, record):
+        if isinstance(record, CommandError):
+            raise record
+        if not isinstance(record, dict):
+            raise CommandError('запись не объект')
+        if not record.get('text'):
+            raise CommandError('нет текста')
+        author_id = self.authors[record.get('author')]
+        if author_id is None:
+            raise CommandError(f'нет автора {record.get("author")!r}')
+        group_id = None
+        if record.get('group'):
+            group_id = self.groups[record['group']]
+            if group_id is None:
+                raise CommandError(f'нет группы {record["group"]!r}')
+        pub_date = timezone.now()
+        if record.get('pub_date'):
+            pub_date = parse_datetime(record['pub_date'])
+            if pub_date is None:
+                raise CommandError(f'неверная дата {record["pub_date"]!r}')
+            if timezone.is_naive(pub_date):
+                pub_date = timezone.make_aware(pub_date)
+        return Post(
+            text=record['text'],
+            author_id=author_id,
+            group_id=group_id,
+            pub_date=pub_date,
+            image=record.get('image') or '',
+        )
+
+    def insert(self, posts):
+        """Вставляет пачку и делает то, что для одного поста делают сигналы."""
+        last_id = Post.objects.aggregate(last=Max('id'))['last'] or 0
+        Post.objects.bulk_create(posts)
+        for author_id, count in Counter(
+                post.author_id for post in posts).items():
+            change_stats(author_id, 'posts_count', count)
+        # SQLite не возвращает id из bulk_create, поэтому новые посты
+        # перечитываются по id: внутри транзакции они идут подряд.
+        timeline.fan_out_many(list(Post.objects.filter(
+            id__gt=last_id).only('id', 'author_id', 'pub_date')))
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from posts import timeline
+from posts.models import Follow
+
+
+class Command(BaseCommand):
+    help = 'Пересобирает ленты подписок пачками.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user', action='append', default=[],
+            help='Пересобрать ленту только этого пользователя.')
+        parser.add_argument(
+            '--batch-size', type=int, default=100,
+            help='Сколько лент пересобирать за одну транзакцию.')
+
+    def handle(self, *args, user, batch_size, **options):
+        followers = Follow.objects.order_by('user_id').values_list(
+            'user_id', flat=True).distinct()
+        if user:
+            followers = followers.filter(user__username__in=user)
+        rebuilt = 0
+        last_id = 0
+        while True:
+            batch = list(followers.filter(user_id__gt=last_id)[:batch_size])
+            if not batch:
+                break
+            with transaction.atomic():
+                for user_id in batch:
+                    timeline.rebuild(user_id)
+            rebuilt += len(batch)
+            last_id = batch[-1]
+            self.stdout.write(f'Пересобрано лент: {rebuilt}')
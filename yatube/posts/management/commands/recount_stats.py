@@ -0,0 +1,74 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from posts.models import STATS_SOURCES, Stats, User
+
+
+def actual_count(model, field):
+    return Coalesce(Subquery(
+        model.objects.filter(**{field: OuterRef('pk')})
+        .order_by().values(field).annotate(count=Count('pk'))
+        .values('count'),
+        output_field=IntegerField(),
+    ), 0)
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает счётчики пользователей пачками.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Сколько пользователей обрабатывать за одну транзакцию.')
+        parser.add_argument(
+            '--check', action='store_true',
+            help='Только найти расхождения, ничего не исправляя.')
+
+    def handle(self, *args, batch_size, check, **options):
+        checked = drifted = 0
+        last_pk = 0
+        while True:
+            with transaction.atomic():
+                users = list(
+                    User.objects.filter(pk__gt=last_pk).order_by('pk')
+                    .select_related('stats')
+                    .annotate(**{
+                        f'actual_{name}': actual_count(model, field)
+                        for name, (model, field) in STATS_SOURCES.items()
+                    })[:batch_size]
+                )
+                if not users:
+                    break
+                fixed = self.compare(users, check)
+            checked += len(users)
+            drifted += len(fixed)
+            last_pk = users[-1].pk
+            for user in fixed:
+                self.stdout.write(f'Расхождение у {user.username}')
+        self.stdout.write(
+            f'Проверено пользователей: {checked}, расхождений: {drifted}')
+
+    def compare(self, users, check):
+        changed, missing, drifted = [], [], []
+        for user in users:
+            actual = {
+                name: getattr(user, f'actual_{name}')
+                for name in STATS_SOURCES
+            }
+            stats = getattr(user, 'stats', None)
+            if stats is None:
+                missing.append(Stats(user=user, **actual))
+            elif any(getattr(stats, name) != value
+                     for name, value in actual.items()):
+                for name, value in actual.items():
+                    setattr(stats, name, value)
+                changed.append(stats)
+            else:
+                continue
+            drifted.append(user)
+        if not check:
+            Stats.objects.bulk_create(missing)
+            Stats.objects.bulk_update(changed, list(STATS_SOURCES))
+        return drifted
@@ -0,0 +1,55 @@
+import multiprocessing
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from posts import thumbnails
+from posts.models import Post
+
+
+class Command(BaseCommand):
+    help = 'Создаёт миниатюры для картинок уже опубликованных постов.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=500,
+            help='Сколько постов читать из базы за раз.')
+        parser.add_argument(
+            '--processes', type=int, default=multiprocessing.cpu_count(),
+            help='Число процессов; 0 — работать в текущем процессе.')
+
+    def handle(self, *args, batch_size, processes, **options):
+        pool = None
+        if processes:
+            # Дочерние процессы не должны делить соединение с родителем.
+            connections.close_all()
+            pool = multiprocessing.Pool(processes)
+        done = failed = 0
+        try:
+            for batch in self.batches(batch_size):
+                if pool is None:
+                    results = map(thumbnails.generate_safely, batch)
+                else:
+                    results = pool.imap_unordered(
+                        thumbnails.generate_safely, batch)
+                for result in results:
+                    done += 1
+                    failed += not result
+                self.stdout.write(f'Обработано картинок: {done}')
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
+        self.stdout.write(f'Готово: {done}, с ошибками: {failed}')
+
+    def batches(self, batch_size):
+        posts = Post.objects.exclude(image='').exclude(
+            image__isnull=True).order_by('pk')
+        last_pk = 0
+        while True:
+            batch = list(posts.filter(pk__gt=last_pk).values_list(
+                'pk', 'image')[:batch_size])
+            if not batch:
+                return
+            last_pk = batch[-1][0]
+            yield [image for _, image in batch]
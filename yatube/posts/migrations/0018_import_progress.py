@@ -0,0 +1,25 @@
+# Generated by Django 2.2.16 on 2026-10-18 18:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0017_post_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportProgress',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(max_length=255, unique=True, verbose_name='Источник')),
+                ('records', models.PositiveIntegerField(default=0, verbose_name='Обработано записей')),
+            ],
+            options={
+                'verbose_name': 'Прогресс загрузки',
+                'verbose_name_plural': 'Прогресс загрузок',
+            },
+        ),
+    ]
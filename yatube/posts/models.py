@@ -1,6 +1,8 @@
 from django.db import models
 from django.contrib.auth import get_user_model
 
+from .search import FTS_TABLE, SearchField
+
 User = get_user_model()
 NUMBER_OF_SYMBOLS = 20
 
@@ -50,9 +52,22 @@ class Post(models.Model):
         blank=True,
         null=True
     )
+    updated = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Дата изменения'
+    )
 
     class Meta:
         ordering = ('-pub_date',)
+        # Индексы по возрастанию: SQLite читает их с конца и отдаёт
+        # порядок (-pub_date, -id), нужный и ленте, и курсорам.
+        indexes = [
+            models.Index(fields=('pub_date',), name='post_pub_date'),
+            models.Index(fields=('author', 'pub_date'),
+                         name='post_author_pub_date'),
+            models.Index(fields=('group', 'pub_date'),
+                         name='post_group_pub_date'),
+        ]
         verbose_name = 'Пост'
         verbose_name_plural = 'Посты'
 
@@ -84,6 +99,10 @@ class Comment(models.Model):
 
     class Meta:
         ordering = ('-pub_date',)
+        indexes = [
+            models.Index(fields=('post', 'pub_date'),
+                         name='comment_post_pub_date'),
+        ]
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
 
@@ -114,9 +133,128 @@ class Follow(models.Model):
                 check=~models.Q(user=models.F('author')),
                 name='prevent self-following')
         ]
+        indexes = [
+            models.Index(fields=('author', 'user'),
+                         name='follow_author_user'),
+        ]
         verbose_name = 'Подписка'
         verbose_name_plural = 'Подписки'
 
     def __str__(self):
         return self.PHRASE_RETURN.format(key_user=self.user.username,
                                          key_author=self.author.username)
+
+
+class Stats(models.Model):
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        related_name='stats',
+        verbose_name='Пользователь',
+    )
+    posts_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Количество постов'
+    )
+    followers_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Количество подписчиков'
+    )
+    following_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Количество подписок'
+    )
+    comments_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Количество комментариев'
+    )
+
+    class Meta:
+        verbose_name = 'Статистика пользователя'
+        verbose_name_plural = 'Статистика пользователей'
+
+    def __str__(self):
+        return self.user.username
+
+
+# Для каждого счётчика — модель и поле, ссылающееся на пользователя.
+STATS_SOURCES = {
+    'posts_count': (Post, 'author'),
+    'followers_count': (Follow, 'author'),
+    'following_count': (Follow, 'user'),
+    'comments_count': (Comment, 'author'),
+}
+
+
+class Timeline(models.Model):
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='timeline',
+        verbose_name='Подписчик',
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='timeline_entries',
+        verbose_name='Пост',
+    )
+    pub_date = models.DateTimeField(verbose_name='Дата публикации')
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=('user', 'post'),
+                                    name='unique_timeline_entry'),
+        ]
+        indexes = [
+            # По возрастанию: обратный проход по индексу даёт и дату,
+            # и id записи по убыванию, как листает CursorPaginator.
+            models.Index(fields=('user', 'pub_date'),
+                         name='timeline_user_pub_date'),
+        ]
+        verbose_name = 'Запись ленты подписок'
+        verbose_name_plural = 'Лента подписок'
+
+    def __str__(self):
+        return f'{self.user_id}: {self.post_id}'
+
+
+class ImportProgress(models.Model):
+    source = models.CharField(
+        max_length=255,
+        unique=True,
+        verbose_name='Источник',
+    )
+    records = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Обработано записей',
+    )
+
+    class Meta:
+        verbose_name = 'Прогресс загрузки'
+        verbose_name_plural = 'Прогресс загрузок'
+
+    def __str__(self):
+        return f'{self.source}: {self.records}'
+
+
+class PostIndex(models.Model):
+    """Строка полнотекстового индекса постов.
+
+    Таблицу FTS5 и триггеры создаёт миграция 0017, Django её не меняет.
+    """
+
+    post = models.OneToOneField(
+        Post,
+        on_delete=models.DO_NOTHING,
+        primary_key=True,
+        db_column='rowid',
+        related_name='search_index',
+    )
+    text = SearchField()
+    # Скрытая колонка FTS5: bm25 строки для текущего MATCH.
+    rank = models.FloatField()
+
+    class Meta:
+        managed = False
+        db_table = FTS_TABLE
@@ -0,0 +1,115 @@
+import base64
+import binascii
+
+from django.db.models import F, Q
+from django.utils.dateparse import parse_datetime
+
+NEXT = 'n'
+PREVIOUS = 'p'
+
+
+class CursorPage:
+    """Страница курсорного паджинатора с интерфейсом, как у Page."""
+
+    def __init__(self, object_list, paginator, next_cursor, previous_cursor):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """Листает выборку по ключу (дата, id) без OFFSET и COUNT(*).
+
+    Дата — первое поле сортировки выборки, id — той же модели, что и она:
+    для ленты подписок это дата и id записи ленты, а не поста. Курсор —
+    непрозрачная строка с направлением и ключом крайней записи, поэтому
+    любая страница стоит столько же, сколько первая.
+    """
+    is_cursor = True
+
+    def __init__(self, queryset, per_page):
+        ordering = queryset.query.order_by or queryset.model._meta.ordering
+        date_field = ordering[0].lstrip('-')
+        prefix = date_field.rpartition('__')[0]
+        # Ключ читается из аннотаций: filter() по полю связанной модели
+        # добавил бы ещё одно соединение вместо уже имеющегося.
+        self.queryset = queryset.annotate(
+            cursor_date=F(date_field),
+            cursor_id=F(f'{prefix}__id' if prefix else 'id'),
+        )
+        self.per_page = per_page
+
+    @staticmethod
+    def encode(direction, obj):
+        raw = f'{direction}|{obj.cursor_date.isoformat()}|{obj.cursor_id}'
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+    @staticmethod
+    def decode(cursor):
+        try:
+            raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+            direction, pub_date, pk = raw.decode().split('|')
+            pub_date = parse_datetime(pub_date)
+            pk = int(pk)
+        except (binascii.Error, UnicodeDecodeError, TypeError, ValueError):
+            return None
+        if direction not in (NEXT, PREVIOUS) or pub_date is None:
+            return None
+        return direction, pub_date, pk
+
+    def get_page(self, cursor):
+        position = self.decode(cursor) if cursor else None
+        if position is None:
+            return self.build_page(
+                self.queryset.order_by('-cursor_date', '-cursor_id'),
+                NEXT, False)
+        direction, date, pk = position
+        if direction == NEXT:
+            queryset = self.queryset.filter(
+                Q(cursor_date__lte=date)
+                & ~Q(cursor_date=date, cursor_id__gte=pk)
+            ).order_by('-cursor_date', '-cursor_id')
+        else:
+            queryset = self.queryset.filter(
+                Q(cursor_date__gte=date)
+                & ~Q(cursor_date=date, cursor_id__lte=pk)
+            ).order_by('cursor_date', 'cursor_id')
+        page = self.build_page(queryset, direction, True)
+        if not page.object_list:
+            return self.get_page(None)
+        return page
+
+    def build_page(self, queryset, direction, from_cursor):
+        rows = list(queryset[:self.per_page + 1])
+        more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if direction == PREVIOUS:
+            rows.reverse()
+            has_next, has_previous = from_cursor, more
+        else:
+            has_next, has_previous = more, from_cursor
+        return CursorPage(
+            rows,
+            self,
+            self.encode(NEXT, rows[-1]) if rows and has_next else None,
+            self.encode(PREVIOUS, rows[0]) if rows and has_previous else None,
+        )
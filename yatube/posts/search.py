@@ -0,0 +1,49 @@
+import re
+
+from django.db import models
+
+FTS_TABLE = 'posts_post_fts'
+# Триггеры из миграции 0017, которые держат индекс в актуальном виде.
+FTS_TRIGGERS = (
+    'posts_post_fts_insert',
+    'posts_post_fts_delete',
+    'posts_post_fts_update',
+)
+
+
+class SearchField(models.TextField):
+    """Колонка таблицы FTS5, по которой можно искать через __match."""
+
+
+@SearchField.register_lookup
+class Match(models.Lookup):
+    lookup_name = 'match'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs} MATCH {rhs}', lhs_params + rhs_params
+
+
+def match_expression(query):
+    """Превращает ввод пользователя в безопасный запрос FTS5.
+
+    Каждое слово берётся в кавычки, чтобы операторы FTS5 в тексте
+    не ломали запрос, и ищется по префиксу.
+    """
+    words = re.findall(r'\w+', query.lower())
+    return ' '.join(f'"{word}"*' for word in words)
+
+
+def search(queryset, query):
+    """Посты, подходящие под запрос, от самых релевантных к менее.
+
+    Пост присоединяется к своей строке индекса, поэтому MATCH выполняется
+    один раз на запрос, а ранг читается из той же строки. count()
+    пагинатора делает ещё один такой же MATCH.
+    """
+    expression = match_expression(query)
+    if not expression:
+        return queryset.none()
+    return queryset.filter(search_index__text__match=expression).order_by(
+        'search_index__rank', '-pub_date')
@@ -0,0 +1,95 @@
+from django.db.models import F
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from core.cache import bump_generation
+
+from . import tasks, timeline
+from .models import Comment, Follow, Group, Post, Stats, User
+
+# Поля пользователя, которые видны на закэшированных страницах.
+NAME_FIELDS = ('username', 'first_name', 'last_name')
+
+
+def shown_name(user):
+    # Через __dict__, чтобы отложенные поля не загружались отдельно.
+    return tuple(user.__dict__.get(field) for field in NAME_FIELDS)
+
+
+def change_stats(user_id, counter, delta):
+    """Сдвигает счётчик пользователя, не опуская его ниже нуля."""
+    stats = Stats.objects.filter(user_id=user_id)
+    if delta < 0:
+        stats = stats.filter(**{f'{counter}__gte': -delta})
+    stats.update(**{counter: F(counter) + delta})
+
+
+@receiver(post_save, sender=User)
+def create_stats(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        Stats.objects.get_or_create(user=instance)
+
+
+@receiver(post_save, sender=Post)
+def post_created(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        change_stats(instance.author_id, 'posts_count', 1)
+        tasks.fan_out.delay(instance.pk)
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance, **kwargs):
+    change_stats(instance.author_id, 'posts_count', -1)
+
+
+@receiver(post_save, sender=Comment)
+def comment_created(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        change_stats(instance.author_id, 'comments_count', 1)
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance, **kwargs):
+    change_stats(instance.author_id, 'comments_count', -1)
+
+
+@receiver(post_save, sender=Follow)
+def follow_created(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        change_stats(instance.author_id, 'followers_count', 1)
+        change_stats(instance.user_id, 'following_count', 1)
+        timeline.backfill(instance.user_id, instance.author_id)
+
+
+@receiver(post_delete, sender=Follow)
+def follow_deleted(sender, instance, **kwargs):
+    change_stats(instance.author_id, 'followers_count', -1)
+    change_stats(instance.user_id, 'following_count', -1)
+    timeline.drop(instance.user_id, instance.author_id)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+@receiver(post_save, sender=Follow)
+@receiver(post_delete, sender=Follow)
+def content_changed(sender, **kwargs):
+    bump_generation()
+
+
+@receiver(post_init, sender=User)
+def remember_name(sender, instance, **kwargs):
+    instance._shown_name = shown_name(instance)
+
+
+@receiver(post_save, sender=User)
+def user_renamed(sender, instance, created, raw=False, **kwargs):
+    """Имя видно на страницах, а last_login, сохраняемый при каждом
+    входе, — нет, поэтому поколение меняется только при смене имени."""
+    if created or raw or instance._shown_name == shown_name(instance):
+        return
+    instance._shown_name = shown_name(instance)
+    bump_generation()
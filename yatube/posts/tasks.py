@@ -0,0 +1,14 @@
+from core.tasks import task
+
+from . import timeline
+from .models import Post
+from .thumbnails import generate_in_background  # noqa: F401
+
+
+@task
+def fan_out(post_id):
+    """Раскладывает пост по лентам подписчиков, если его ещё не удалили."""
+    post = Post.objects.filter(pk=post_id).only(
+        'id', 'author_id', 'pub_date').first()
+    if post is not None:
+        timeline.fan_out(post)
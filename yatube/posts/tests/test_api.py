@@ -0,0 +1,96 @@
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Comment, Follow, Group, Post, User
+from yatube.settings import POSTS_ON_PAGE
+
+USERNAME = 'Author'
+FOLLOWER = 'Follower'
+GROUP_SLUG = 'test_slug'
+API_INDEX_URL = reverse('posts:api_index')
+API_GROUP_URL = reverse('posts:api_group_list', args=[GROUP_SLUG])
+API_PROFILE_URL = reverse('posts:api_profile', args=[USERNAME])
+API_FOLLOW_URL = reverse('posts:api_follow_index')
+API_MISSING_URL = reverse('posts:api_profile', args=['nobody'])
+POSTS_COUNT = POSTS_ON_PAGE + 3
+
+
+class ApiTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=USERNAME)
+        cls.follower = User.objects.create_user(username=FOLLOWER)
+        cls.group = Group.objects.create(
+            title='Группа', slug=GROUP_SLUG, description='Описание')
+        Follow.objects.create(user=cls.follower, author=cls.user)
+        for number in range(POSTS_COUNT):
+            cls.post = Post.objects.create(
+                text=f'Пост {number}', author=cls.user, group=cls.group)
+        Comment.objects.create(
+            post=cls.post, author=cls.follower, text='Комментарий')
+        cls.API_POST_URL = reverse(
+            'posts:api_post_detail', args=[cls.post.id])
+        cls.guest = Client()
+        cls.reader = Client()
+        cls.reader.force_login(cls.follower)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_feeds_use_cursor_pages(self):
+        cases = [
+            [API_INDEX_URL, self.guest],
+            [API_GROUP_URL, self.guest],
+            [API_PROFILE_URL, self.guest],
+            [API_FOLLOW_URL, self.reader],
+        ]
+        for url, client in cases:
+            with self.subTest(url=url):
+                first = client.get(url).json()
+                self.assertEqual(len(first['results']), POSTS_ON_PAGE)
+                self.assertEqual(first['results'][0]['id'], self.post.id)
+                self.assertIsNone(first['previous'])
+                second = client.get(url, {'cursor': first['next']}).json()
+                self.assertEqual(
+                    len(second['results']), POSTS_COUNT - POSTS_ON_PAGE)
+                self.assertIsNone(second['next'])
+
+    def test_sparse_fields(self):
+        results = self.guest.get(
+            API_INDEX_URL, {'fields': 'id,author'}).json()['results']
+        self.assertEqual(
+            results[0], {'id': self.post.id, 'author': USERNAME})
+
+    def test_unknown_field(self):
+        response = self.guest.get(API_INDEX_URL, {'fields': 'id,password'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('password', response.json()['error'])
+
+    def test_post_detail(self):
+        data = self.guest.get(self.API_POST_URL).json()
+        self.assertEqual(data['post']['text'], self.post.text)
+        self.assertEqual(data['post']['group'], GROUP_SLUG)
+        self.assertEqual(data['post']['author_posts_count'], POSTS_COUNT)
+        self.assertEqual(
+            [comment['author'] for comment in data['comments']], [FOLLOWER])
+
+    def test_errors_are_json(self):
+        self.assertEqual(self.guest.get(API_FOLLOW_URL).status_code, 401)
+        response = self.guest.get(API_MISSING_URL)
+        self.assertEqual(response.status_code, 404)
+        self.assertIn('error', response.json())
+
+    def test_query_budget_matches_html(self):
+        budgets = [
+            [API_INDEX_URL, self.guest, 1],
+            [API_GROUP_URL, self.guest, 2],
+            [API_PROFILE_URL, self.guest, 2],
+            [API_FOLLOW_URL, self.reader, 3],
+            [self.API_POST_URL, self.guest, 2],
+        ]
+        for url, client, queries in budgets:
+            with self.subTest(url=url):
+                with self.assertNumQueries(queries):
+                    client.get(url)
@@ -0,0 +1,48 @@
+import json
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+
+VIEWS = [
+    'index', 'group_posts', 'profile', 'post_detail',
+    'follow_index', 'post_create', 'add_comment',
+]
+
+
+class BenchCommandTests(TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.output = os.path.join(self.folder, 'bench.json')
+
+    def tearDown(self):
+        shutil.rmtree(self.folder, ignore_errors=True)
+
+    def test_bench_leaves_site_cache_alone(self):
+        cache.set('bench:marker', 1)
+        self.addCleanup(cache.delete, 'bench:marker')
+        call_command(
+            'bench', use_current_db=True, users=2, groups=1, posts=2,
+            comments=1, follows=1, images=0, requests=1, warmup=0,
+            cold=True, output=self.output, stdout=StringIO())
+        self.assertEqual(cache.get('bench:marker'), 1)
+
+    def test_bench_writes_report(self):
+        errors = StringIO()
+        call_command(
+            'bench', use_current_db=True, users=3, groups=2, posts=10,
+            comments=5, follows=2, images=2, requests=3, warmup=1,
+            cold=True, output=self.output, stdout=StringIO(), stderr=errors)
+        self.assertEqual(errors.getvalue(), '')
+        with open(self.output) as report:
+            views = json.load(report)['views']
+        self.assertEqual(list(views), VIEWS)
+        for name, row in views.items():
+            with self.subTest(view=name):
+                self.assertEqual(row['requests'], 3)
+                self.assertLessEqual(row['p50_ms'], row['p99_ms'])
+                self.assertGreater(row['queries_max'], 0)
@@ -0,0 +1,242 @@
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from django.contrib.auth.models import update_last_login
+from django.core.cache import cache
+from django.db import connection
+from django.shortcuts import render
+from django.conf import settings
+from django.test import (
+    Client, TestCase, TransactionTestCase, override_settings)
+from django.urls import reverse
+
+from core.cache import GENERATION_KEY, bump_generation, generation
+from core.cache_backends import LocalTier, TwoTierCache
+from posts.models import Group, Post, User
+
+USERNAME = 'Author'
+POST_TEXT = 'Тестовый текст'
+POST_TEXT_NEW = 'Текст без отметки изменения'
+POST_TEXT_EDIT = 'Отредактированный текст'
+NEW_USERNAME = 'Renamed'
+GROUP_TITLE = 'Группа'
+NEW_GROUP_TITLE = 'Переименованная группа'
+INDEX_URL = reverse('posts:index')
+WORKERS = 8
+RENDER_DELAY = 0.3
+SHARED_ALIAS = 'two_tier_tests'
+
+
+class CacheStampedeTests(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        user = User.objects.create_user(username=USERNAME)
+        Post.objects.create(text=POST_TEXT, author=user)
+
+    def get_index(self, _):
+        try:
+            return Client().get(INDEX_URL).status_code
+        finally:
+            connection.close()
+
+    def concurrent_renders(self):
+        def slow_render(*args, **kwargs):
+            time.sleep(RENDER_DELAY)
+            return render(*args, **kwargs)
+
+        with mock.patch('posts.views.render',
+                        side_effect=slow_render) as renders:
+            with ThreadPoolExecutor(WORKERS) as pool:
+                codes = list(pool.map(self.get_index, range(WORKERS)))
+        self.assertEqual(codes, [200] * WORKERS)
+        return renders.call_count
+
+    def test_cold_cache_is_rendered_once(self):
+        self.assertEqual(self.concurrent_renders(), 1)
+
+    def test_stale_copy_is_served_while_one_request_renders(self):
+        Client().get(INDEX_URL)
+        bump_generation()
+        self.assertEqual(self.concurrent_renders(), 1)
+
+
+class PostCardCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=USERNAME)
+        cls.group = Group.objects.create(
+            title=GROUP_TITLE, slug='test_slug', description='Описание')
+        cls.post = Post.objects.create(
+            text=POST_TEXT, author=cls.user, group=cls.group)
+        cls.author = Client()
+        cls.author.force_login(cls.user)
+        cls.POST_EDIT_URL = reverse('posts:post_edit', args=[cls.post.id])
+
+    def setUp(self):
+        cache.clear()
+
+    def test_card_is_cached_until_post_edit(self):
+        self.author.get(INDEX_URL)
+        # update() не меняет отметку изменения, карточка берётся из кэша.
+        Post.objects.filter(pk=self.post.pk).update(text=POST_TEXT_NEW)
+        bump_generation()
+        self.assertNotContains(self.author.get(INDEX_URL), POST_TEXT_NEW)
+        self.author.post(self.POST_EDIT_URL, data={'text': POST_TEXT_EDIT})
+        self.assertContains(self.author.get(INDEX_URL), POST_TEXT_EDIT)
+
+    def rename_user(self):
+        # Свежий объект: отметка об имени у общего cls.user могла
+        # остаться от другого теста, а база после него откатилась.
+        user = User.objects.get(pk=self.user.pk)
+        user.username = NEW_USERNAME
+        user.save()
+
+    def test_user_rename_invalidates_pages(self):
+        self.author.get(INDEX_URL)
+        self.rename_user()
+        self.assertContains(self.author.get(INDEX_URL), f'@{NEW_USERNAME}')
+
+    def test_login_does_not_invalidate_pages(self):
+        before = generation()
+        update_last_login(None, User.objects.get(pk=self.user.pk))
+        self.assertEqual(generation(), before)
+
+    def test_card_follows_author_and_group_renames(self):
+        self.author.get(INDEX_URL)
+        self.rename_user()
+        self.group.title = NEW_GROUP_TITLE
+        self.group.save()
+        response = self.author.get(INDEX_URL)
+        self.assertContains(response, f'@{NEW_USERNAME}')
+        self.assertContains(response, f'#{NEW_GROUP_TITLE}')
+
+
+class ConditionalGetTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=USERNAME)
+        cls.post = Post.objects.create(text=POST_TEXT, author=cls.user)
+        cls.URLS = [
+            INDEX_URL,
+            reverse('posts:profile', args=[USERNAME]),
+            reverse('posts:post_detail', args=[cls.post.id]),
+        ]
+        cls.guest = Client()
+        cls.author = Client()
+        cls.author.force_login(cls.user)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_unchanged_page_is_not_rendered(self):
+        for url in self.URLS:
+            with self.subTest(url=url):
+                response = self.guest.get(url)
+                with self.assertNumQueries(0), \
+                        mock.patch('posts.views.render') as renders:
+                    again = self.guest.get(
+                        url, HTTP_IF_NONE_MATCH=response['ETag'])
+                self.assertEqual(again.status_code, 304)
+                renders.assert_not_called()
+                again = self.guest.get(
+                    url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+                self.assertEqual(again.status_code, 304)
+
+    def test_changes_and_users_get_new_etag(self):
+        etag = self.guest.get(INDEX_URL)['ETag']
+        self.assertNotEqual(self.author.get(INDEX_URL)['ETag'], etag)
+        Post.objects.create(text=POST_TEXT_NEW, author=self.user)
+        response = self.guest.get(INDEX_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, POST_TEXT_NEW)
+
+    def test_generation_survives_bump(self):
+        generation()
+        bump_generation()
+        self.assertIsNone(cache.shared_timeout(GENERATION_KEY))
+
+    def test_stale_copy_keeps_its_own_etag(self):
+        etag = self.guest.get(INDEX_URL)['ETag']
+        bump_generation()
+        with mock.patch('core.cache.cache.add', return_value=False):
+            response = self.guest.get(INDEX_URL)
+        self.assertEqual(response['ETag'], etag)
+        response = self.guest.get(INDEX_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+
+class TwoTierCacheTests(TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.folder, ignore_errors=True)
+        shared = override_settings(CACHES={**settings.CACHES, SHARED_ALIAS: {
+            'BACKEND':
+                'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.path.join(self.folder, 'data'),
+        }})
+        shared.enable()
+        self.addCleanup(shared.disable)
+        self.first = self.backend()
+        self.second = self.backend()
+        # Второй экземпляр ведёт себя как другой процесс.
+        self.second.local = LocalTier(self.second.channel, 2, 60)
+        self.first.clear()
+
+    def backend(self, **options):
+        return TwoTierCache(self.folder, {
+            'OPTIONS': {'SHARED': SHARED_ALIAS, 'LOCAL_SIZE': 2, **options}})
+
+    def test_changes_reach_other_processes(self):
+        self.first.set('key', 1)
+        self.assertEqual(self.second.get('key'), 1)
+        self.first.set('key', 2)
+        self.assertEqual(self.second.get('key'), 2)
+        self.first.delete('key')
+        self.assertIsNone(self.second.get('key'))
+
+    def test_local_copy_is_served_without_shared_cache(self):
+        self.first.set('key', 1)
+        self.second.get('key')
+        with mock.patch.object(
+                TwoTierCache, 'shared', new_callable=mock.PropertyMock
+        ) as shared:
+            self.assertEqual(self.second.get('key'), 1)
+        shared.assert_not_called()
+
+    def test_clear_and_compaction_drop_local_copies(self):
+        self.first.set('key', 1)
+        self.second.get('key')
+        self.first.shared.set('key', 2)
+        self.first.compact()
+        self.assertEqual(self.second.get('key'), 2)
+        self.first.shared.set('key', 3)
+        self.first.clear()
+        self.assertIsNone(self.second.get('key'))
+
+    def test_local_tier_is_bounded(self):
+        for key in ('a', 'b', 'c'):
+            self.second.set(key, key)
+        self.assertEqual(len(self.second.local.items), 2)
+        self.assertEqual(self.second.get('a'), 'a')
+
+    def test_incr_keeps_expiry(self):
+        self.first.set('forever', 1, None)
+        self.first.set('soon', 1, 60)
+        self.second.incr('forever')
+        self.second.incr('soon')
+        self.assertIsNone(self.first.shared_timeout('forever'))
+        self.assertAlmostEqual(
+            self.first.shared_timeout('soon'), 60, delta=5)
+
+    def test_incr_is_atomic(self):
+        self.first.set('counter', 0)
+        with ThreadPoolExecutor(WORKERS) as pool:
+            list(pool.map(
+                lambda _: self.second.incr('counter'), range(WORKERS * 5)))
+        self.assertEqual(self.first.get('counter'), WORKERS * 5)
@@ -0,0 +1,61 @@
+import os
+import shutil
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import connections
+from django.db.backends.sqlite3.base import DatabaseWrapper
+from django.test import SimpleTestCase
+
+from yatube.settings import DB_PROFILES
+
+
+class DatabaseProfileTests(SimpleTestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.folder, ignore_errors=True)
+
+    def connect(self):
+        settings = dict(connections.databases['default'])
+        settings['NAME'] = os.path.join(self.folder, 'profile.sqlite3')
+        wrapper = DatabaseWrapper(settings, alias='profile')
+        self.addCleanup(wrapper.close)
+        wrapper.ensure_connection()
+        return wrapper.connection
+
+    def test_production_profile_tunes_new_connections(self):
+        with mock.patch('core.signals.DB_PROFILE', 'production'):
+            connection = self.connect()
+        pragmas = DB_PROFILES['production']['PRAGMAS']
+        self.assertEqual(
+            connection.execute('PRAGMA journal_mode').fetchone(), ('wal',))
+        self.assertEqual(
+            connection.execute('PRAGMA busy_timeout').fetchone(),
+            (pragmas['busy_timeout'],))
+        self.assertEqual(
+            connection.execute('PRAGMA cache_size').fetchone(),
+            (pragmas['cache_size'],))
+
+    def test_default_profile_leaves_sqlite_alone(self):
+        with mock.patch('core.signals.DB_PROFILE', 'default'):
+            connection = self.connect()
+        self.assertEqual(
+            connection.execute('PRAGMA journal_mode').fetchone(),
+            ('delete',))
+
+    def test_stress_command_compares_profiles(self):
+        output = StringIO()
+        call_command('stress_db', seconds=0.2, readers=2, writers=1,
+                     stdout=output)
+        lines = output.getvalue().splitlines()
+        rows = {line.split()[0]: line.split()[1:]
+                for line in lines[1:len(DB_PROFILES) + 1]}
+        self.assertEqual(list(rows), list(DB_PROFILES))
+        # WAL и busy_timeout не должны добавлять ошибок блокировки.
+        self.assertLessEqual(
+            int(rows['production'][2]), int(rows['default'][2]))
+        delta = lines[len(DB_PROFILES) + 1]
+        self.assertTrue(delta.startswith('production против default:'))
+        self.assertRegex(delta, r'блокировок (-\d+|\+0)$')
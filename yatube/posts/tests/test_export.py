@@ -0,0 +1,74 @@
+import csv
+import json
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Group, Post, User
+
+USERNAME = 'Author'
+OTHER_USERNAME = 'Other'
+GROUP_SLUG = 'test_slug'
+GROUP_EXPORT_URL = reverse('posts:group_export', args=[GROUP_SLUG])
+PROFILE_EXPORT_URL = reverse('posts:profile_export', args=[OTHER_USERNAME])
+
+
+class ExportTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=USERNAME)
+        cls.other = User.objects.create_user(username=OTHER_USERNAME)
+        cls.group = Group.objects.create(
+            title='Группа', slug=GROUP_SLUG, description='Описание')
+        cls.first = Post.objects.create(
+            text='Первый', author=cls.user, group=cls.group)
+        cls.second = Post.objects.create(
+            text='Второй, с запятой', author=cls.other, group=cls.group)
+        Post.objects.create(text='Вне группы', author=cls.other)
+        cls.guest = Client()
+
+    def test_group_export_ndjson(self):
+        response = self.guest.get(GROUP_EXPORT_URL)
+        self.assertTrue(response.streaming)
+        self.assertIn('attachment', response['Content-Disposition'])
+        records = [json.loads(line) for line in b''.join(
+            response.streaming_content).decode().splitlines()]
+        self.assertEqual(
+            [record['text'] for record in records],
+            ['Первый', 'Второй, с запятой'])
+        self.assertEqual(records[0]['author'], USERNAME)
+        self.assertEqual(records[0]['group'], GROUP_SLUG)
+        self.assertEqual(
+            records[0]['pub_date'], self.first.pub_date.isoformat())
+
+    def test_profile_export_csv(self):
+        response = self.guest.get(PROFILE_EXPORT_URL, {'format': 'csv'})
+        self.assertTrue(response['Content-Type'].startswith('text/csv'))
+        rows = list(csv.DictReader(StringIO(b''.join(
+            response.streaming_content).decode())))
+        self.assertEqual(
+            [row['text'] for row in rows],
+            ['Второй, с запятой', 'Вне группы'])
+
+    def test_unknown_format(self):
+        response = self.guest.get(GROUP_EXPORT_URL, {'format': 'xml'})
+        self.assertEqual(response.status_code, 404)
+
+    def test_command_round_trip(self):
+        folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, folder, ignore_errors=True)
+        path = os.path.join(folder, 'group.csv')
+        call_command('export_posts', group=GROUP_SLUG, file_format='csv',
+                     output=path)
+        Post.objects.filter(group=self.group).delete()
+        call_command('import_posts', path, stdout=StringIO())
+        self.assertEqual(
+            set(self.group.posts.values_list('text', 'author', 'pub_date')),
+            {(self.first.text, self.user.id, self.first.pub_date),
+             (self.second.text, self.other.id, self.second.pub_date)})
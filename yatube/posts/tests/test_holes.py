@@ -0,0 +1,98 @@
+import re
+
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Comment, Follow, Post, User
+
+AUTHOR = 'Author'
+FOLLOWER = 'Follower'
+INDEX_URL = reverse('posts:index')
+PROFILE_URL = reverse('posts:profile', args=[AUTHOR])
+ABOUT_URL = reverse('about:author')
+CSRF_RE = re.compile(r'name="csrfmiddlewaretoken" value="([^"]+)"')
+
+
+class HolePunchingTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author_user = User.objects.create_user(username=AUTHOR)
+        cls.follower_user = User.objects.create_user(username=FOLLOWER)
+        Follow.objects.create(user=cls.follower_user, author=cls.author_user)
+        cls.post = Post.objects.create(text='Текст', author=cls.author_user)
+        cls.POST_DETAIL_URL = reverse(
+            'posts:post_detail', args=[cls.post.id])
+        cls.ADD_COMMENT_URL = reverse(
+            'posts:add_comment', args=[cls.post.id])
+
+    def setUp(self):
+        cache.clear()
+        self.guest = Client()
+        self.author = Client()
+        self.author.force_login(self.author_user)
+        self.follower = Client()
+        self.follower.force_login(self.follower_user)
+
+    def get(self, client, url):
+        response = client.get(url)
+        return response.wsgi_request.page_cache, response.content.decode()
+
+    def test_one_cached_page_serves_every_user(self):
+        outcome, page = self.get(self.author, INDEX_URL)
+        self.assertEqual(outcome, 'miss')
+        self.assertIn(f'>{AUTHOR}</a>', page)
+        self.assertIn('Избранные авторы', page)
+        outcome, page = self.get(self.guest, INDEX_URL)
+        self.assertEqual(outcome, 'hit')
+        self.assertIn('Войти', page)
+        self.assertNotIn(f'>{AUTHOR}</a>', page)
+        self.assertNotIn('Избранные авторы', page)
+        self.assertNotIn('<!--hole:', page)
+
+    def test_follow_button_is_per_user(self):
+        cases = [
+            (self.follower, 'miss', 'Отписаться'),
+            (self.author, 'hit', None),
+            (self.guest, 'hit', None),
+        ]
+        for client, expected, button in cases:
+            with self.subTest(expected=expected, button=button):
+                outcome, page = self.get(client, PROFILE_URL)
+                self.assertEqual(outcome, expected)
+                self.assertNotIn('Подписаться', page)
+                if button:
+                    self.assertIn(button, page)
+                else:
+                    self.assertNotIn('Отписаться', page)
+
+    def test_edit_button_and_comment_form_are_per_user(self):
+        _, page = self.get(self.guest, self.POST_DETAIL_URL)
+        self.assertNotIn('Редактировать пост', page)
+        self.assertNotIn('csrfmiddlewaretoken', page)
+        outcome, page = self.get(self.follower, self.POST_DETAIL_URL)
+        self.assertEqual(outcome, 'hit')
+        self.assertNotIn('Редактировать пост', page)
+        self.assertIn('csrfmiddlewaretoken', page)
+        _, page = self.get(self.author, self.POST_DETAIL_URL)
+        self.assertIn('Редактировать пост', page)
+
+    def test_comment_form_from_cached_page_passes_csrf(self):
+        self.guest.get(self.POST_DETAIL_URL)
+        client = Client(enforce_csrf_checks=True)
+        client.force_login(self.follower_user)
+        response = client.get(self.POST_DETAIL_URL)
+        self.assertEqual(response.wsgi_request.page_cache, 'hit')
+        self.assertIn('csrftoken', response.cookies)
+        token = CSRF_RE.search(response.content.decode()).group(1)
+        response = client.post(self.ADD_COMMENT_URL, {
+            'text': 'Комментарий', 'csrfmiddlewaretoken': token})
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue(Comment.objects.filter(text='Комментарий').exists())
+
+    def test_about_page_is_cached(self):
+        self.assertEqual(self.get(self.guest, ABOUT_URL)[0], 'miss')
+        outcome, page = self.get(self.author, ABOUT_URL)
+        self.assertEqual(outcome, 'hit')
+        self.assertIn(f'>{AUTHOR}</a>', page)
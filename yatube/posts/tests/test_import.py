@@ -0,0 +1,128 @@
+import json
+import os
+import shutil
+import tempfile
+from datetime import datetime, timezone
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from posts.management.commands.import_posts import Command
+from posts.models import (Follow, Group, ImportProgress, Post, Stats,
+                          Timeline, User)
+
+AUTHOR = 'Author'
+FOLLOWER = 'Follower'
+GROUP_SLUG = 'test_slug'
+RECORDS = [
+    {'text': 'Первый', 'author': AUTHOR, 'group': GROUP_SLUG,
+     'pub_date': '2020-01-02T03:04:05+00:00'},
+    {'text': 'Без автора', 'author': 'Nobody'},
+    {'text': 'Без группы в базе', 'author': AUTHOR, 'group': 'missing'},
+    {'text': 'Второй', 'author': AUTHOR},
+]
+
+
+class ImportPostsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username=AUTHOR)
+        cls.follower = User.objects.create_user(username=FOLLOWER)
+        cls.group = Group.objects.create(
+            title='Группа', slug=GROUP_SLUG, description='Описание')
+        Follow.objects.create(user=cls.follower, author=cls.author)
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.folder, ignore_errors=True)
+
+    def write(self, name, content):
+        path = os.path.join(self.folder, name)
+        with open(path, 'w', encoding='utf-8') as output:
+            output.write(content)
+        return path
+
+    def import_posts(self, path, **options):
+        errors = StringIO()
+        call_command('import_posts', path, batch_size=2,
+                     stdout=StringIO(), stderr=errors, **options)
+        return errors.getvalue()
+
+    def test_ndjson_import(self):
+        path = self.write('posts.ndjson', '\n'.join(
+            json.dumps(record, ensure_ascii=False) for record in RECORDS))
+        errors = self.import_posts(path)
+        self.assertIn('Запись 2: нет автора', errors)
+        self.assertIn('Запись 3: нет группы', errors)
+        first = Post.objects.get(text='Первый')
+        self.assertEqual(first.group, self.group)
+        self.assertEqual(
+            first.pub_date, datetime(2020, 1, 2, 3, 4, 5, tzinfo=timezone.utc))
+        self.assertTrue(Post.objects.filter(text='Второй').exists())
+        self.assertEqual(Stats.objects.get(user=self.author).posts_count, 2)
+        self.assertEqual(
+            Timeline.objects.filter(user=self.follower).count(), 2)
+        self.assertFalse(ImportProgress.objects.exists())
+
+    def test_csv_import(self):
+        path = self.write(
+            'posts.csv',
+            'text,author,group,pub_date\n'
+            f'"Пост, с запятой",{AUTHOR},{GROUP_SLUG},2021-05-06 07:08:09\n')
+        self.assertEqual(self.import_posts(path), '')
+        post = Post.objects.get()
+        self.assertEqual(post.text, 'Пост, с запятой')
+        self.assertEqual(post.pub_date.year, 2021)
+
+    def test_resume_from_checkpoint(self):
+        path = self.write('posts.ndjson', '\n'.join(
+            json.dumps(record, ensure_ascii=False) for record in RECORDS))
+        ImportProgress.objects.create(source=path, records=3)
+        self.assertEqual(self.import_posts(path), '')
+        self.assertEqual(
+            list(Post.objects.values_list('text', flat=True)), ['Второй'])
+
+    def test_failed_batch_is_not_imported_twice(self):
+        path = self.write('posts.ndjson', '\n'.join(
+            json.dumps(record, ensure_ascii=False) for record in RECORDS))
+        insert = Command.insert
+        calls = []
+
+        def fail_second_batch(command, posts):
+            calls.append(posts)
+            insert(command, posts)
+            if len(calls) == 2:
+                raise RuntimeError('Сбой')
+
+        with mock.patch.object(Command, 'insert', fail_second_batch):
+            with self.assertRaises(RuntimeError):
+                self.import_posts(path)
+        self.assertEqual(ImportProgress.objects.get().records, 2)
+        self.import_posts(path)
+        self.assertEqual(
+            sorted(Post.objects.values_list('text', flat=True)),
+            ['Второй', 'Первый'])
+
+    def test_empty_file(self):
+        path = self.write('empty.ndjson', '\n  \n')
+        self.assertEqual(self.import_posts(path), '')
+        self.assertFalse(Post.objects.exists())
+        self.assertFalse(ImportProgress.objects.exists())
+
+    def test_malformed_lines_are_skipped(self):
+        path = self.write('posts.ndjson', '\n'.join([
+            '{"text": "Первый", "author": "Author"}',
+            '',
+            '{"text": оборвано',
+            '[1, 2]',
+            '{"text": "Второй", "author": "Author"}',
+        ]))
+        errors = self.import_posts(path)
+        self.assertIn('Запись 3: неверный JSON', errors)
+        self.assertIn('Запись 4: запись не объект', errors)
+        self.assertEqual(Post.objects.count(), 2)
@@ -0,0 +1,87 @@
+import re
+from types import SimpleNamespace
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.models import Comment, Follow, Group, Post, User
+from posts.paginators import NEXT, CursorPaginator
+
+USERNAME = 'Author'
+FOLLOWER = 'Follower'
+GROUP_SLUG = 'test_slug'
+POST_TEXT = 'Тестовый текст'
+INDEX_URL = reverse('posts:index')
+GROUP_LIST_URL = reverse('posts:group_list', args=[GROUP_SLUG])
+PROFILE_URL = reverse('posts:profile', args=[USERNAME])
+FOLLOW_URL = reverse('posts:follow_index')
+# Полный проход по таблице без индекса или сортировка во временном B-дереве.
+BAD_PLAN = re.compile(
+    r'^SCAN (TABLE )?\w+$|^SCAN (TABLE )?\w+ AS \w+$|USE TEMP B-TREE')
+
+
+class QueryPlanTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=USERNAME)
+        cls.follower = User.objects.create_user(username=FOLLOWER)
+        cls.group = Group.objects.create(
+            title='Группа', slug=GROUP_SLUG, description='Описание')
+        cls.post = Post.objects.create(
+            text=POST_TEXT, author=cls.user, group=cls.group)
+        Comment.objects.create(
+            text=POST_TEXT, author=cls.follower, post=cls.post)
+        Follow.objects.create(user=cls.follower, author=cls.user)
+        cls.reader = Client()
+        cls.reader.force_login(cls.follower)
+        cls.POST_DETAIL_URL = reverse(
+            'posts:post_detail', args=[cls.post.id])
+
+    def setUp(self):
+        cache.clear()
+
+    def plans(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            self.reader.get(url)
+        with connection.cursor() as cursor:
+            for query in queries.captured_queries:
+                sql = query['sql']
+                if 'ORDER BY' not in sql:
+                    continue
+                cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+                yield sql, [row[-1] for row in cursor.fetchall()]
+
+    def test_feed_queries_use_indexes(self):
+        urls = [
+            INDEX_URL,
+            GROUP_LIST_URL,
+            PROFILE_URL,
+            FOLLOW_URL,
+            self.POST_DETAIL_URL,
+        ]
+        self.check_plans(urls)
+
+    @mock.patch('posts.views.CURSOR_PAGINATION', True)
+    def test_cursor_queries_use_indexes(self):
+        cursor = CursorPaginator.encode(NEXT, SimpleNamespace(
+            cursor_date=self.post.pub_date, cursor_id=self.post.id + 1))
+        self.check_plans([
+            INDEX_URL,
+            GROUP_LIST_URL,
+            PROFILE_URL,
+            FOLLOW_URL,
+            f'{FOLLOW_URL}?cursor={cursor}',
+        ])
+
+    def check_plans(self, urls):
+        for url in urls:
+            for sql, plan in self.plans(url):
+                with self.subTest(url=url, sql=sql):
+                    self.assertFalse(
+                        [step for step in plan if BAD_PLAN.search(step)],
+                        plan)
@@ -0,0 +1,124 @@
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from core import metrics
+from posts.models import Post, User
+
+INDEX_URL = reverse('posts:index')
+METRICS_URL = reverse('metrics')
+LOCAL_IP = '127.0.0.1'
+FOREIGN_IP = '10.0.0.1'
+INDEX = (('view', 'posts:index'),)
+REQUESTS = ('yatube_requests_total', INDEX + (
+    ('method', 'GET'), ('status', '200')))
+
+
+def cache_outcome(result):
+    return ('yatube_page_cache_total', INDEX + (('result', result),))
+
+
+class MetricsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Author')
+        cls.staff = User.objects.create_user(
+            username='Staff', is_staff=True)
+        Post.objects.create(text='Текст', author=cls.user)
+        cls.guest = Client()
+
+    def setUp(self):
+        cache.clear()
+        self.folder = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.folder, ignore_errors=True)
+
+    def test_requests_are_counted_per_route(self):
+        before = metrics.snapshot()
+        self.guest.get(INDEX_URL)
+        self.guest.get(INDEX_URL)
+        after = metrics.snapshot()
+        self.assertEqual(after[REQUESTS] - before.get(REQUESTS, 0), 2)
+        for result in ('miss', 'hit'):
+            with self.subTest(result=result):
+                key = cache_outcome(result)
+                self.assertEqual(after[key] - before.get(key, 0), 1)
+        queries = ('yatube_db_queries', INDEX)
+        self.assertEqual(
+            sum(after[queries][:-1]) - sum(before.get(queries, [0])[:-1]), 2)
+
+    @mock.patch('core.views.METRICS_ALLOWED_IPS', (LOCAL_IP,))
+    def test_endpoint_renders_prometheus_text(self):
+        self.guest.get(INDEX_URL)
+        response = self.guest.get(METRICS_URL, REMOTE_ADDR=LOCAL_IP)
+        text = response.content.decode()
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+        self.assertIn('# TYPE yatube_request_duration_seconds histogram',
+                      text)
+        self.assertIn('yatube_request_duration_seconds_bucket'
+                      '{view="posts:index",le="+Inf"}', text)
+        self.assertIn('yatube_response_size_bytes_count'
+                      '{view="posts:index"}', text)
+
+    def test_endpoint_is_closed_to_guests_by_default(self):
+        response = self.guest.get(METRICS_URL, REMOTE_ADDR=LOCAL_IP)
+        self.assertEqual(response.status_code, 403)
+
+    @mock.patch('core.views.METRICS_ALLOWED_IPS', (LOCAL_IP,))
+    def test_endpoint_is_closed_to_outside_guests(self):
+        response = self.guest.get(METRICS_URL, REMOTE_ADDR=FOREIGN_IP)
+        self.assertEqual(response.status_code, 403)
+
+    def test_endpoint_is_open_to_staff(self):
+        client = Client()
+        client.force_login(self.staff)
+        response = client.get(METRICS_URL, REMOTE_ADDR=FOREIGN_IP)
+        self.assertEqual(response.status_code, 200)
+
+    def test_threads_are_merged(self):
+        key = ('yatube_requests_total', (('view', 'thread-test'),))
+        worker = threading.Thread(
+            target=metrics.inc, args=key)
+        worker.start()
+        worker.join()
+        metrics.inc(*key)
+        self.assertEqual(metrics.snapshot()[key], 2)
+
+    def test_processes_are_merged_through_directory(self):
+        key = ('yatube_requests_total', (('view', 'other-process'),))
+        # Родительский процесс заведомо жив, его файл не удаляется.
+        path = os.path.join(self.folder, f'{os.getppid()}.json')
+        with open(path, 'w') as other:
+            json.dump([[key[0], key[1], 5]], other)
+        with mock.patch('core.metrics.METRICS_DIR', self.folder):
+            metrics.inc(*key)
+            metrics.flush(force=True)
+            self.assertTrue(os.path.exists(
+                metrics.snapshot_path(os.getpid())))
+            self.assertEqual(metrics.collect()[key], 6)
+
+    def test_exited_processes_keep_their_totals(self):
+        key = ('yatube_requests_total', (('view', 'exited-process'),))
+        with mock.patch('core.metrics.METRICS_DIR', self.folder):
+            for _ in range(2):
+                exited = subprocess.Popen([sys.executable, '-c', ''])
+                exited.wait()
+                path = metrics.snapshot_path(exited.pid)
+                with open(path, 'w') as other:
+                    json.dump([[key[0], key[1], 5]], other)
+                metrics.collect()
+                self.assertFalse(os.path.exists(path))
+            # Повторный сбор не считает перенесённое дважды.
+            self.assertEqual(metrics.collect()[key], 10)
+            self.assertTrue(os.path.exists(metrics.exited_path()))
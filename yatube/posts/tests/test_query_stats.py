@@ -0,0 +1,48 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Post, User
+
+USERNAME = 'Author'
+
+
+class QueryStatsMiddlewareTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=USERNAME)
+        cls.post = Post.objects.create(text='Текст', author=cls.user)
+        cls.POST_DETAIL_URL = reverse('posts:post_detail', args=[cls.post.id])
+        cls.guest = Client()
+
+    def setUp(self):
+        cache.clear()
+
+    def test_server_timing_header(self):
+        response = self.guest.get(self.POST_DETAIL_URL)
+        timing = response['Server-Timing']
+        self.assertIn('db;desc="2 queries"', timing)
+        self.assertIn('db-slowest;dur=', timing)
+        self.assertIn('total;dur=', timing)
+
+    def test_over_budget_is_logged(self):
+        with mock.patch('core.middleware.QUERY_BUDGET', 1):
+            with self.assertLogs('core.middleware', 'WARNING') as logs:
+                self.guest.get(self.POST_DETAIL_URL)
+        self.assertEqual(len(logs.output), 1)
+        self.assertIn(self.POST_DETAIL_URL, logs.output[0])
+        self.assertIn('SELECT', logs.output[0])
+
+    def test_within_budget_is_not_logged(self):
+        with mock.patch('core.middleware.logger') as logger:
+            self.guest.get(self.POST_DETAIL_URL)
+        logger.warning.assert_not_called()
+
+    def test_streaming_response_has_no_timing(self):
+        response = self.guest.get(
+            reverse('posts:profile_export', args=[USERNAME]))
+        self.assertTrue(response.streaming)
+        self.assertNotIn('Server-Timing', response)
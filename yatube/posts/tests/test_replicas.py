@@ -0,0 +1,83 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, TransactionTestCase
+
+from core import db_routers
+from core.cache import bump_generation, generation
+from core.middleware import PIN_COOKIE, replica_reads
+from posts.models import Post, User
+
+REPLICA = 'replica_1'
+
+
+@mock.patch('core.db_routers.REPLICA_DATABASES', [REPLICA])
+@mock.patch('core.middleware.REPLICA_DATABASES', [REPLICA])
+class ReplicaRoutingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.factory = RequestFactory()
+        self.router = db_routers.ReplicaRouter()
+        self.seen = []
+
+    def view(self, write=False):
+        def view(request):
+            if write:
+                self.router.db_for_write(Post)
+            self.seen.append(self.router.db_for_read(Post))
+            return HttpResponse()
+        return replica_reads(view)
+
+    def test_reads_outside_requests_use_primary(self):
+        self.assertEqual(self.router.db_for_read(Post), 'default')
+        self.assertEqual(self.router.db_for_write(Post), 'default')
+
+    def test_fresh_replica_serves_safe_requests(self):
+        bump_generation()
+        db_routers.mark_synced(generation())
+        response = self.view()(self.factory.get('/'))
+        self.assertEqual(self.seen, [REPLICA])
+        self.assertNotIn(PIN_COOKIE, response.cookies)
+
+    def test_lagging_replica_is_skipped(self):
+        db_routers.mark_synced(generation())
+        bump_generation()
+        self.view()(self.factory.get('/'))
+        self.assertEqual(self.seen, ['default'])
+
+    def test_writes_pin_user_to_primary(self):
+        db_routers.mark_synced(generation())
+        response = self.view(write=True)(self.factory.get('/'))
+        self.assertEqual(self.seen, ['default'])
+        self.assertIn(PIN_COOKIE, response.cookies)
+        response = self.view()(self.factory.post('/'))
+        self.assertIn(PIN_COOKIE, response.cookies)
+        request = self.factory.get('/')
+        request.COOKIES[PIN_COOKIE] = '1'
+        self.view()(request)
+        self.assertEqual(self.seen, ['default', 'default', 'default'])
+
+
+class SyncReplicasTests(TransactionTestCase):
+    def test_replica_gets_copy_and_generation(self):
+        folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, folder, ignore_errors=True)
+        self.addCleanup(cache.clear)
+        path = os.path.join(folder, 'replica.sqlite3')
+        user = User.objects.create_user(username='Author')
+        Post.objects.create(text='Текст', author=user)
+        call_command('sync_replicas', path, stdout=StringIO())
+        replica = sqlite3.connect(path)
+        self.addCleanup(replica.close)
+        self.assertEqual(
+            replica.execute('SELECT text FROM posts_post').fetchall(),
+            [('Текст',)])
+        self.assertTrue(db_routers.replicas_fresh(generation()))
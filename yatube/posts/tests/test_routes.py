@@ -10,14 +10,23 @@ POST_ID = 1
 ROUTES = [
     ['/', 'index', []],
     [f'/group/{SLUG}/', 'group_list', [SLUG]],
+    [f'/group/{SLUG}/export/', 'group_export', [SLUG]],
+    ['/search/', 'search', []],
     ['/create/', 'post_create', []],
     [f'/profile/{USERNAME}/', 'profile', [USERNAME]],
+    [f'/profile/{USERNAME}/export/', 'profile_export', [USERNAME]],
     [f'/posts/{POST_ID}/', 'post_detail', [POST_ID]],
     [f'/posts/{POST_ID}/edit/', 'post_edit', [POST_ID]],
+    [f'/posts/{POST_ID}/comments/', 'post_comments', [POST_ID]],
     [f'/posts/{POST_ID}/comment/', 'add_comment', [POST_ID]],
     ['/follow/', 'follow_index', []],
     [f'/profile/{USERNAME}/follow/', 'profile_follow', [USERNAME]],
     [f'/profile/{USERNAME}/unfollow/', 'profile_unfollow', [USERNAME]],
+    ['/api/posts/', 'api_index', []],
+    [f'/api/posts/{POST_ID}/', 'api_post_detail', [POST_ID]],
+    [f'/api/group/{SLUG}/', 'api_group_list', [SLUG]],
+    [f'/api/profile/{USERNAME}/', 'api_profile', [USERNAME]],
+    ['/api/follow/', 'api_follow_index', []],
 ]
 
 
@@ -0,0 +1,97 @@
+from django.contrib.admin.sites import site
+from django.db import connection
+from django.test import Client, RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.models import Group, Post, User
+from posts.search import FTS_TRIGGERS
+
+USERNAME = 'Author'
+OTHER_USERNAME = 'Other'
+GROUP_SLUG = 'test_slug'
+SEARCH_URL = reverse('posts:search')
+ADMIN_URL = reverse('admin:posts_post_changelist')
+
+
+class SearchTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=USERNAME)
+        cls.other = User.objects.create_user(username=OTHER_USERNAME)
+        cls.group = Group.objects.create(
+            title='Группа', slug=GROUP_SLUG, description='Описание')
+        cls.best = Post.objects.create(
+            text='Котики и ещё раз котики', author=cls.user, group=cls.group)
+        cls.good = Post.objects.create(
+            text='Про котиков и собак, а также про погоду',
+            author=cls.other)
+        cls.unrelated = Post.objects.create(
+            text='Рецепт борща', author=cls.user)
+        cls.guest = Client()
+
+    def found(self, **params):
+        response = self.guest.get(SEARCH_URL, params)
+        return [post.id for post in response.context['page_obj']]
+
+    def test_search_is_ranked(self):
+        self.assertEqual(self.found(q='котик'), [self.best.id, self.good.id])
+
+    def test_search_filters(self):
+        self.assertEqual(
+            self.found(q='котик', group=GROUP_SLUG), [self.best.id])
+        self.assertEqual(
+            self.found(q='котик', author=OTHER_USERNAME), [self.good.id])
+
+    def test_index_follows_edits_and_deletes(self):
+        self.unrelated.text = 'Борщ для котиков'
+        self.unrelated.save()
+        self.assertIn(self.unrelated.id, self.found(q='котик'))
+        Post.objects.filter(pk=self.best.pk).delete()
+        self.assertNotIn(self.best.id, self.found(q='котик'))
+
+    def test_query_syntax_is_escaped(self):
+        self.assertEqual(self.found(q='"котик* OR ('), [])
+        self.assertEqual(self.found(q='*'), [])
+
+    def test_admin_uses_index(self):
+        admin = site._registry[Post]
+        request = RequestFactory().get('/')
+        queryset, _ = admin.get_search_results(
+            request, Post.objects.all(), 'борщ')
+        self.assertEqual(list(queryset), [self.unrelated])
+
+    def test_admin_keeps_rank_order(self):
+        client = Client()
+        client.force_login(User.objects.create_superuser(
+            username='Admin', email='admin@example.com', password='pass'))
+        response = client.get(ADMIN_URL, {'q': 'котик'})
+        self.assertEqual(
+            [post.id for post in response.context['cl'].result_list],
+            [self.best.id, self.good.id])
+
+    def test_triggers_exist(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'trigger' "
+                "AND tbl_name = 'posts_post'")
+            triggers = {name for name, in cursor.fetchall()}
+        self.assertTrue(set(FTS_TRIGGERS) <= triggers,
+                        set(FTS_TRIGGERS) - triggers)
+
+    def test_match_runs_once_per_query(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.found(q='котик')
+        searches = [query['sql'] for query in queries.captured_queries
+                    if 'MATCH' in query['sql']]
+        # Выборка страницы и count() пагинатора.
+        self.assertEqual(len(searches), 2)
+        with connection.cursor() as cursor:
+            for sql in searches:
+                with self.subTest(sql=sql):
+                    self.assertEqual(sql.count('MATCH'), 1)
+                    cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+                    plan = [row[-1] for row in cursor.fetchall()]
+                    self.assertFalse(
+                        [step for step in plan if 'SUBQUERY' in step], plan)
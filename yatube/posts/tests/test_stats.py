@@ -0,0 +1,72 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Comment, Follow, Post, Stats, User
+
+USERNAME = 'Author'
+FOLLOWER = 'Follower'
+POST_TEXT = 'Тестовый текст'
+COMMENT_TEXT = 'Тестовый комментарий'
+POST_CREATE_URL = reverse('posts:post_create')
+PROFILE_FOLLOW_URL = reverse('posts:profile_follow', args=[USERNAME])
+PROFILE_UNFOLLOW_URL = reverse('posts:profile_unfollow', args=[USERNAME])
+
+
+class StatsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=USERNAME)
+        cls.follower = User.objects.create_user(username=FOLLOWER)
+        cls.author = Client()
+        cls.author.force_login(cls.user)
+        cls.follow = Client()
+        cls.follow.force_login(cls.follower)
+
+    def stats(self, user):
+        return Stats.objects.get(user=user)
+
+    def test_counters_follow_views(self):
+        self.author.post(POST_CREATE_URL, data={'text': POST_TEXT})
+        post = Post.objects.get()
+        self.follow.post(
+            reverse('posts:add_comment', args=[post.id]),
+            data={'text': COMMENT_TEXT})
+        self.follow.get(PROFILE_FOLLOW_URL)
+        author = self.stats(self.user)
+        follower = self.stats(self.follower)
+        self.assertEqual(author.posts_count, 1)
+        self.assertEqual(author.followers_count, 1)
+        self.assertEqual(follower.following_count, 1)
+        self.assertEqual(follower.comments_count, 1)
+        self.follow.get(PROFILE_UNFOLLOW_URL)
+        post.delete()
+        author = self.stats(self.user)
+        follower = self.stats(self.follower)
+        self.assertEqual(author.posts_count, 0)
+        self.assertEqual(author.followers_count, 0)
+        self.assertEqual(follower.following_count, 0)
+        self.assertEqual(follower.comments_count, 0)
+
+    def test_recount_stats_repairs_drift(self):
+        post = Post.objects.create(text=POST_TEXT, author=self.user)
+        Comment.objects.create(
+            text=COMMENT_TEXT, post=post, author=self.follower)
+        Follow.objects.create(user=self.follower, author=self.user)
+        Stats.objects.filter(user=self.user).update(
+            posts_count=5, followers_count=0)
+        Stats.objects.filter(user=self.follower).delete()
+        out = StringIO()
+        call_command('recount_stats', '--check', stdout=out)
+        self.assertIn('расхождений: 2', out.getvalue())
+        self.assertEqual(self.stats(self.user).posts_count, 5)
+        call_command('recount_stats', '--batch-size', '1', stdout=out)
+        author = self.stats(self.user)
+        follower = self.stats(self.follower)
+        self.assertEqual(author.posts_count, 1)
+        self.assertEqual(author.followers_count, 1)
+        self.assertEqual(follower.following_count, 1)
+        self.assertEqual(follower.comments_count, 1)
@@ -0,0 +1,104 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core import mail
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from core.models import Task
+from core.tasks import task
+from posts.models import Follow, Post, Timeline, User
+
+AUTHOR = 'Author'
+FOLLOWER = 'Follower'
+EMAIL = 'follower@example.com'
+PASSWORD = 'secret-password'
+PASSWORD_RESET_URL = reverse('password_reset')
+calls = []
+
+
+@task(retries=1, retry_delay=0)
+def flaky(value):
+    calls.append(value)
+    if len(calls) < 3:
+        raise ValueError('Ещё не время')
+
+
+def run_worker():
+    output = StringIO()
+    call_command('run_worker', once=True, workers=0, stdout=output)
+    return output.getvalue()
+
+
+@mock.patch('core.tasks.TASKS_EAGER', False)
+class TaskQueueTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username=AUTHOR)
+        cls.follower = User.objects.create_user(
+            username=FOLLOWER, email=EMAIL, password=PASSWORD)
+        Follow.objects.create(user=cls.follower, author=cls.author)
+
+    def setUp(self):
+        calls.clear()
+        cache.clear()
+
+    def test_fan_out_waits_for_worker(self):
+        post = Post.objects.create(text='Текст', author=self.author)
+        self.assertFalse(Timeline.objects.filter(post=post).exists())
+        self.assertIn('Выполнено: 1, с ошибками: 0', run_worker())
+        self.assertTrue(
+            Timeline.objects.filter(post=post, user=self.follower).exists())
+        self.assertFalse(Task.objects.exists())
+
+    def test_retries_then_fails(self):
+        flaky.delay(1)
+        self.assertIn('с ошибками: 1', run_worker())
+        job = Task.objects.get()
+        self.assertEqual(job.status, Task.PENDING)
+        self.assertIn('Ещё не время', job.error)
+        run_worker()
+        job.refresh_from_db()
+        self.assertEqual(job.status, Task.FAILED)
+        self.assertEqual(job.attempts, 2)
+        self.assertEqual(calls, [1, 1])
+
+    def test_stuck_task_is_requeued(self):
+        flaky.delay(1)
+        Task.objects.update(
+            status=Task.RUNNING,
+            started=timezone.now() - timedelta(days=1))
+        run_worker()
+        self.assertEqual(calls, [1])
+
+    @mock.patch('core.tasks.logger')
+    def test_backlog_is_reported(self, logger):
+        flaky.delay(1)
+        logger.warning.assert_not_called()
+        Task.objects.update(run_at=timezone.now() - timedelta(days=1))
+        cache.clear()
+        flaky.delay(2)
+        logger.warning.assert_called_once()
+        self.assertEqual(logger.warning.call_args[0][2], 1)
+
+    def test_password_reset_email_is_queued(self):
+        Client().post(PASSWORD_RESET_URL, {'email': EMAIL})
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(Task.objects.get().name, 'users.tasks.send_email')
+        run_worker()
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, [EMAIL])
+
+
+class EagerTaskTests(TestCase):
+    def test_eager_mode_runs_immediately(self):
+        calls.clear()
+        with self.assertRaises(ValueError):
+            flaky.delay(2)
+        self.assertEqual(calls, [2])
+        self.assertFalse(Task.objects.exists())
@@ -0,0 +1,102 @@
+import os
+import shutil
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from sorl.thumbnail.conf import settings as sorl_settings
+
+from core.cache_backends import TwoTierCache
+from core.kvstore import NO_KEY_LIST
+from posts import thumbnails
+from posts.models import Post, User
+
+USERNAME = 'Author'
+POST_TEXT = 'Тестовый текст'
+CREATE_POST_URL = reverse('posts:post_create')
+INDEX_URL = reverse('posts:index')
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+def uploaded(name='small.gif'):
+    return SimpleUploadedFile(
+        name=name, content=SMALL_GIF, content_type='image/gif')
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class ThumbnailsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=USERNAME)
+        cls.author = Client()
+        cls.author.force_login(cls.user)
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    @mock.patch('posts.views.thumbnails.generate_later')
+    def test_upload_schedules_thumbnails(self, generate_later):
+        self.author.post(
+            CREATE_POST_URL, data={'text': POST_TEXT, 'image': uploaded()})
+        generate_later.assert_called_once_with(Post.objects.get())
+
+    @mock.patch('posts.thumbnails.get_thumbnail', side_effect=OSError)
+    def test_thumbnail_failure_does_not_break_upload(self, get_thumbnail):
+        with self.assertLogs('posts.thumbnails', 'ERROR'):
+            response = self.author.post(CREATE_POST_URL, data={
+                'text': POST_TEXT, 'image': uploaded('broken.gif')})
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue(Post.objects.exists())
+
+    def test_warm_thumbnails(self):
+        Post.objects.create(text=POST_TEXT, author=self.user)
+        Post.objects.create(
+            text=POST_TEXT, author=self.user, image=uploaded('warm.gif'))
+        out = StringIO()
+        call_command(
+            'warm_thumbnails', '--processes', '0', '--batch-size', '1',
+            stdout=out)
+        self.assertIn('Готово: 1, с ошибками: 0', out.getvalue())
+        thumbnails_dir = os.path.join(TEMP_MEDIA_ROOT, 'cache')
+        self.assertTrue(any(files for _, _, files in os.walk(thumbnails_dir)))
+
+    def test_key_listing_commands_explain_failure(self):
+        for action in ('cleanup', 'clear'):
+            with self.subTest(action=action):
+                with self.assertRaisesMessage(CommandError, NO_KEY_LIST):
+                    call_command('thumbnail', action, verbosity=0)
+
+    def test_feed_page_resolves_thumbnails_in_one_lookup(self):
+        for i in range(3):
+            post = Post.objects.create(
+                text=POST_TEXT, author=self.user, image=uploaded(f'{i}.gif'))
+            thumbnails.generate(post.image.name)
+        # Как в другом процессе: в памяти ещё ничего нет.
+        caches['default'].local.clear()
+        shared = mock.Mock(wraps=caches['shared'])
+        with mock.patch.object(TwoTierCache, 'shared', mock.PropertyMock(
+                return_value=shared)):
+            response = Client().get(INDEX_URL)
+        self.assertEqual(response.content.count(b'<img class="card-img'), 3)
+        prefix = sorl_settings.THUMBNAIL_KEY_PREFIX
+        self.assertEqual(shared.get_many.call_count, 1)
+        self.assertEqual([
+            call for call in shared.get.call_args_list
+            if call[0][0].startswith(prefix)], [])
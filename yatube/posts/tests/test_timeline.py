@@ -0,0 +1,84 @@
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts import timeline
+from posts.models import Follow, Post, Timeline, User
+
+USERNAME = 'Author'
+FOLLOWER = 'Follower'
+POST_TEXT = 'Тестовый текст'
+FEED_SIZE = 3
+FOLLOW_URL = reverse('posts:follow_index')
+PROFILE_FOLLOW_URL = reverse('posts:profile_follow', args=[USERNAME])
+PROFILE_UNFOLLOW_URL = reverse('posts:profile_unfollow', args=[USERNAME])
+
+
+@mock.patch('posts.timeline.FOLLOW_FEED_SIZE', FEED_SIZE)
+class TimelineTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=USERNAME)
+        cls.follower = User.objects.create_user(username=FOLLOWER)
+        cls.follow = Client()
+        cls.follow.force_login(cls.follower)
+
+    def timeline(self):
+        return list(Timeline.objects.filter(
+            user=self.follower).order_by('-pub_date', '-id').values_list(
+            'post_id', flat=True))
+
+    def feed(self):
+        return [post.id for post in
+                self.follow.get(FOLLOW_URL).context['page_obj']]
+
+    def create_posts(self, count):
+        return [Post.objects.create(text=POST_TEXT, author=self.user).id
+                for _ in range(count)]
+
+    def test_follow_backfills_and_caps_timeline(self):
+        posts = self.create_posts(FEED_SIZE + 2)
+        self.follow.get(PROFILE_FOLLOW_URL)
+        self.assertEqual(self.timeline(), posts[::-1][:FEED_SIZE])
+        self.assertEqual(self.feed(), self.timeline())
+
+    def test_new_post_is_fanned_out_and_trimmed(self):
+        self.follow.get(PROFILE_FOLLOW_URL)
+        posts = self.create_posts(FEED_SIZE + 1)
+        self.assertEqual(self.timeline(), posts[::-1][:FEED_SIZE])
+
+    def test_trim_walks_only_the_index(self):
+        self.follow.get(PROFILE_FOLLOW_URL)
+        self.create_posts(FEED_SIZE + 1)
+        with CaptureQueriesContext(connection) as queries:
+            timeline.trim([self.follower.id])
+        with connection.cursor() as cursor:
+            for query in queries.captured_queries:
+                cursor.execute(f'EXPLAIN QUERY PLAN {query["sql"]}')
+                plan = [row[-1] for row in cursor.fetchall()]
+                with self.subTest(sql=query['sql']):
+                    self.assertFalse(
+                        [step for step in plan
+                         if 'TEMP B-TREE' in step or 'INDEX' not in step
+                         and step.startswith(('SCAN', 'SEARCH'))], plan)
+
+    def test_unfollow_clears_timeline(self):
+        self.follow.get(PROFILE_FOLLOW_URL)
+        self.create_posts(2)
+        self.follow.get(PROFILE_UNFOLLOW_URL)
+        self.assertEqual(self.timeline(), [])
+        self.assertEqual(self.feed(), [])
+
+    def test_rebuild_timelines(self):
+        posts = self.create_posts(2)
+        Follow.objects.create(user=self.follower, author=self.user)
+        Timeline.objects.all().delete()
+        call_command(
+            'rebuild_timelines', '--user', FOLLOWER, stdout=StringIO())
+        self.assertEqual(self.timeline(), posts[::-1])
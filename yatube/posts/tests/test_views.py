@@ -1,19 +1,22 @@
 import shutil
 import tempfile
+from unittest import mock
 
 from django.conf import settings
 from django.core.cache import cache
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.test import Client, TestCase, override_settings
 from django.urls import reverse
+from django.utils import timezone
 
-from yatube.settings import POSTS_ON_PAGE
-from posts.models import Group, Post, Follow, User
+from yatube.settings import COMMENTS_ON_PAGE, POSTS_ON_PAGE
+from posts.models import Comment, Group, Post, Follow, User
 
 GROUP_TITLE = 'Группа1'
 GROUP_SLUG = 'test_slug'
 GROUP_DESCRIPTION = 'Тестовая группа 1'
 POST_TEXT = 'Тестовый текст'
+POST_TEXT_NEW = 'Новый текст'
 USERNAME = 'Username'
 FOLLOWER = 'Follower'
 NOT_FOLLOWER = 'NotFollower'
@@ -168,13 +171,24 @@ class PostPagesTests(TestCase):
 
     def test_cache_index(self):
         response1 = self.author.get(INDEX_URL)
-        Post.objects.all().delete()
+        # update() не шлёт сигналов, поэтому кэш остаётся прежним.
+        Post.objects.update(text=POST_TEXT_NEW)
         response2 = self.author.get(INDEX_URL)
         cache.clear()
         response3 = self.author.get(INDEX_URL)
         self.assertEqual(response2.content, response1.content)
         self.assertNotEqual(response3.content, response2.content)
 
+    def test_cache_dropped_on_changes(self):
+        urls = [INDEX_URL, GROUP_LIST_URL, PROFILE_URL]
+        for url in urls:
+            self.guest.get(url)
+        Post.objects.create(
+            text=POST_TEXT_NEW, author=self.user, group=self.group)
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertContains(self.guest.get(url), POST_TEXT_NEW)
+
     def test_follow(self):
         Follow.objects.create(user=self.follower, author=self.user)
         self.follow.get(PROFILE_FOLLOW_URL)
@@ -186,3 +200,136 @@ class PostPagesTests(TestCase):
         self.follow.get(PROFILE_UNFOLLOW_URL)
         follow = Follow.objects.filter(user=self.follower, author=self.user)
         self.assertFalse(follow.exists())
+
+
+class FeedQueriesTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=USERNAME)
+        cls.follower = User.objects.create_user(username=FOLLOWER)
+        cls.group = Group.objects.create(
+            title=GROUP_TITLE,
+            slug=GROUP_SLUG,
+            description=GROUP_DESCRIPTION,
+        )
+        Post.objects.bulk_create(
+            Post(text=f'Post {i}', author=cls.user, group=cls.group)
+            for i in range(POSTS_ON_PAGE)
+        )
+        Follow.objects.create(user=cls.follower, author=cls.user)
+        cls.guest = Client()
+        cls.follow = Client()
+        cls.follow.force_login(cls.follower)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_feed_query_budget(self):
+        budgets = [
+            [INDEX_URL, self.guest, 2],
+            [GROUP_LIST_URL, self.guest, 3],
+            [PROFILE_URL, self.guest, 3],
+            [FOLLOW_URL, self.follow, 4],
+        ]
+        for url, client, queries in budgets:
+            with self.subTest(url=url):
+                with self.assertNumQueries(queries):
+                    client.get(url)
+
+
+@mock.patch('posts.views.CURSOR_PAGINATION', True)
+class CursorPaginatorTests(TestCase):
+    POSTS_COUNT = POSTS_ON_PAGE * 2 + 3
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=USERNAME)
+        Post.objects.bulk_create(
+            Post(text=f'Post {i}', author=cls.user)
+            for i in range(cls.POSTS_COUNT)
+        )
+        # Одинаковое время публикации проверяет порядок по id.
+        Post.objects.update(pub_date=timezone.now())
+        cls.guest = Client()
+
+    def setUp(self):
+        cache.clear()
+
+    def walk(self, cursor_name):
+        pages = []
+        url = INDEX_URL
+        while url:
+            page = self.guest.get(url).context['page_obj']
+            pages.append([post.id for post in page])
+            cursor = getattr(page, cursor_name)
+            url = cursor and f'{INDEX_URL}?cursor={cursor}'
+        return pages, page
+
+    def test_cursor_pages_cover_feed_in_order(self):
+        pages, last_page = self.walk('next_cursor')
+        ids = [post_id for page in pages for post_id in page]
+        self.assertEqual(
+            ids,
+            list(Post.objects.order_by('-pub_date', '-id')
+                 .values_list('id', flat=True)))
+        self.assertEqual(
+            [len(page) for page in pages],
+            [POSTS_ON_PAGE, POSTS_ON_PAGE, 3])
+        response = self.guest.get(
+            f'{INDEX_URL}?cursor={last_page.previous_cursor}')
+        self.assertEqual(
+            [post.id for post in response.context['page_obj']], pages[1])
+        self.assertTrue(response.context['page_obj'].has_previous())
+
+    def test_cursor_page_query_count(self):
+        page = self.guest.get(INDEX_URL).context['page_obj']
+        cache.clear()
+        with self.assertNumQueries(1):
+            self.guest.get(f'{INDEX_URL}?cursor={page.next_cursor}')
+
+    def test_broken_cursor_returns_first_page(self):
+        response = self.guest.get(f'{INDEX_URL}?cursor=broken')
+        self.assertEqual(len(response.context['page_obj']), POSTS_ON_PAGE)
+        self.assertFalse(response.context['page_obj'].has_previous())
+
+
+class CommentsPaginationTests(TestCase):
+    COMMENTS_COUNT = COMMENTS_ON_PAGE + 5
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=USERNAME)
+        cls.post = Post.objects.create(text=POST_TEXT, author=cls.user)
+        Comment.objects.bulk_create(
+            Comment(text=f'Comment {i}', author=cls.user, post=cls.post)
+            for i in range(cls.COMMENTS_COUNT)
+        )
+        cls.POST_DETAIL_URL = reverse('posts:post_detail', args=[cls.post.id])
+        cls.guest = Client()
+
+    def setUp(self):
+        cache.clear()
+
+    def test_detail_shows_first_comments_page(self):
+        with self.assertNumQueries(2):
+            response = self.guest.get(self.POST_DETAIL_URL)
+        comments = response.context['comments']
+        self.assertEqual(len(comments), COMMENTS_ON_PAGE)
+        self.assertTrue(comments.has_next())
+
+    def test_comments_fragment_loads_older_comments(self):
+        comments = self.guest.get(self.POST_DETAIL_URL).context['comments']
+        response = self.guest.get(
+            reverse('posts:post_comments', args=[self.post.id]),
+            {'cursor': comments.next_cursor})
+        older = response.context['comments']
+        self.assertTemplateUsed(response, 'posts/includes/comments_list.html')
+        self.assertEqual(
+            [comment.id for comment in comments]
+            + [comment.id for comment in older],
+            list(Comment.objects.order_by('-pub_date', '-id')
+                 .values_list('id', flat=True)))
+        self.assertFalse(older.has_next())
@@ -0,0 +1,36 @@
+import logging
+
+from sorl.thumbnail import get_thumbnail
+
+from core.tasks import task
+from yatube.settings import THUMBNAIL_GEOMETRIES
+
+logger = logging.getLogger(__name__)
+
+
+def generate(image_name):
+    """Создаёт миниатюры картинки во всех размерах из настроек."""
+    for geometry, options in THUMBNAIL_GEOMETRIES:
+        get_thumbnail(image_name, geometry, **options)
+
+
+def generate_safely(image_name):
+    try:
+        generate(image_name)
+    except Exception:
+        logger.exception('Не удалось создать миниатюры для %s', image_name)
+        return False
+    return True
+
+
+@task
+def generate_in_background(image_name):
+    # Ошибка попадает в лог, а не в ответ на запрос, если задача
+    # выполняется сразу (TASKS_EAGER).
+    generate_safely(image_name)
+
+
+def generate_later(post):
+    """Отдаёт создание миниатюр поста фоновому воркеру."""
+    if post.image:
+        generate_in_background.delay(post.image.name)
@@ -0,0 +1,83 @@
+from django.db import connection
+
+from yatube.settings import FOLLOW_FEED_SIZE
+
+from .models import Follow, Post, Timeline
+
+
+def trim(user_ids):
+    """Оставляет в лентах пользователей не больше FOLLOW_FEED_SIZE постов.
+
+    Граница каждой ленты — её FOLLOW_FEED_SIZE-я запись с конца, которую
+    находит обход покрывающего индекса (user, pub_date). У ленты короче
+    границы нет, и запрос ничего не удаляет.
+    """
+    table = Timeline._meta.db_table
+    with connection.cursor() as cursor:
+        for user_id in user_ids:
+            cursor.execute(
+                f'DELETE FROM {table} WHERE user_id = %s'
+                f' AND (pub_date, id) < ('
+                f'  SELECT pub_date, id FROM {table} WHERE user_id = %s'
+                f'  ORDER BY pub_date DESC, id DESC LIMIT 1 OFFSET %s)',
+                [user_id, user_id, FOLLOW_FEED_SIZE - 1],
+            )
+
+
+def fan_out(post):
+    """Раскладывает новый пост по лентам подписчиков автора."""
+    followers = list(Follow.objects.filter(
+        author_id=post.author_id).values_list('user_id', flat=True))
+    Timeline.objects.bulk_create(
+        (Timeline(user_id=user_id, post=post, pub_date=post.pub_date)
+         for user_id in followers),
+        ignore_conflicts=True,
+    )
+    trim(followers)
+
+
+def fan_out_many(posts):
+    """Раскладывает пачку постов по лентам подписчиков их авторов."""
+    followers = {}
+    for user_id, author_id in Follow.objects.filter(
+            author_id__in={post.author_id for post in posts}
+    ).values_list('user_id', 'author_id'):
+        followers.setdefault(author_id, []).append(user_id)
+    Timeline.objects.bulk_create(
+        (Timeline(user_id=user_id, post_id=post.id, pub_date=post.pub_date)
+         for post in posts
+         for user_id in followers.get(post.author_id, ())),
+        ignore_conflicts=True,
+    )
+    trim({user_id for users in followers.values() for user_id in users})
+
+
+def backfill(user_id, author_id):
+    """Добавляет в ленту подписчика последние посты нового автора."""
+    posts = Post.objects.filter(author_id=author_id).order_by(
+        '-pub_date').values_list('id', 'pub_date')[:FOLLOW_FEED_SIZE]
+    Timeline.objects.bulk_create(
+        (Timeline(user_id=user_id, post_id=post_id, pub_date=pub_date)
+         for post_id, pub_date in posts),
+        ignore_conflicts=True,
+    )
+    trim([user_id])
+
+
+def drop(user_id, author_id):
+    """Убирает из ленты подписчика посты автора, от которого он отписался."""
+    Timeline.objects.filter(
+        user_id=user_id, post__author_id=author_id).delete()
+
+
+def rebuild(user_id):
+    """Собирает ленту подписчика заново по его текущим подпискам."""
+    Timeline.objects.filter(user_id=user_id).delete()
+    posts = Post.objects.filter(
+        author__following__user_id=user_id
+    ).order_by('-pub_date').values_list(
+        'id', 'pub_date')[:FOLLOW_FEED_SIZE]
+    Timeline.objects.bulk_create(
+        Timeline(user_id=user_id, post_id=post_id, pub_date=pub_date)
+        for post_id, pub_date in posts
+    )
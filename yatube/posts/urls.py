@@ -1,6 +1,6 @@
 from django.urls import path
 
-from . import views
+from . import api, views
 
 app_name = 'posts'
 
@@ -11,18 +11,30 @@ urlpatterns = [
     path('profile/<str:username>/',
          views.profile,
          name='profile'),
+    path('profile/<str:username>/export/',
+         views.profile_export,
+         name='profile_export'),
     path('posts/<int:post_id>/',
          views.post_detail,
          name='post_detail'),
     path('group/<slug:slug>/',
          views.group_posts,
          name='group_list'),
+    path('group/<slug:slug>/export/',
+         views.group_export,
+         name='group_export'),
+    path('search/',
+         views.search,
+         name='search'),
     path('create/',
          views.post_create,
          name='post_create'),
     path('posts/<int:post_id>/edit/',
          views.post_edit,
          name='post_edit'),
+    path('posts/<int:post_id>/comments/',
+         views.post_comments,
+         name='post_comments'),
     path('posts/<int:post_id>/comment/',
          views.add_comment,
          name='add_comment'),
@@ -35,4 +47,19 @@ urlpatterns = [
     path('profile/<str:username>/unfollow/',
          views.profile_unfollow,
          name='profile_unfollow'),
+    path('api/posts/',
+         api.index,
+         name='api_index'),
+    path('api/posts/<int:post_id>/',
+         api.post_detail,
+         name='api_post_detail'),
+    path('api/group/<slug:slug>/',
+         api.group_posts,
+         name='api_group_list'),
+    path('api/profile/<str:username>/',
+         api.profile,
+         name='api_profile'),
+    path('api/follow/',
+         api.follow_index,
+         name='api_follow_index'),
 ]
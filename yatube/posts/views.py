@@ -1,48 +1,128 @@
 from django.contrib.auth.decorators import login_required
 from django.core.paginator import Paginator
+from django.http import Http404, StreamingHttpResponse
 from django.shortcuts import get_object_or_404, redirect, render
-from django.views.decorators.cache import cache_page
 
-from yatube.settings import POSTS_ON_PAGE
+from core.cache import page_conditions, versioned_cache_page
+from core.kvstore import prefetch_thumbnails
+from yatube.settings import (COMMENTS_ON_PAGE, CURSOR_PAGINATION,
+                             PAGE_CACHE_TIMEOUT, POSTS_ON_PAGE)
 
-from .forms import CommentForm, PostForm
+from . import export, thumbnails
+from .forms import CommentForm, PostForm, SearchForm
 from .models import Follow, Group, Post, User
+from .paginators import CursorPaginator
+from .search import search as search_posts
 
 
-def page_obj(queryset, request):
-    return Paginator(queryset, POSTS_ON_PAGE).get_page(request.GET.get('page'))
+def feed(queryset):
+    """Подгружает автора, его счётчики и группу одним запросом."""
+    return queryset.select_related('author__stats', 'group')
 
 
-@cache_page(20, key_prefix='index_page')
+def page_obj(queryset, request, by_cursor=None):
+    if by_cursor is None:
+        by_cursor = CURSOR_PAGINATION
+    if by_cursor:
+        page = CursorPaginator(queryset, POSTS_ON_PAGE).get_page(
+            request.GET.get('cursor'))
+    else:
+        page = Paginator(queryset, POSTS_ON_PAGE).get_page(
+            request.GET.get('page'))
+    prefetch_thumbnails(post.image for post in page)
+    return page
+
+
+@page_conditions
+@versioned_cache_page(PAGE_CACHE_TIMEOUT, key_prefix='index_page')
 def index(request):
     return render(request, 'posts/index.html', {
-        'page_obj': page_obj(Post.objects.all(), request),
+        'page_obj': page_obj(feed(Post.objects.all()), request),
     })
 
 
+@page_conditions
+@versioned_cache_page(PAGE_CACHE_TIMEOUT, key_prefix='group_page')
 def group_posts(request, slug):
     group = get_object_or_404(Group, slug=slug)
     return render(request, 'posts/group_list.html', {
-        'page_obj': page_obj(group.posts.all(), request),
+        'page_obj': page_obj(feed(group.posts.all()), request),
         'group': group,
     })
 
 
+@page_conditions
+@versioned_cache_page(PAGE_CACHE_TIMEOUT, key_prefix='profile_page')
 def profile(request, username):
-    author = get_object_or_404(User, username=username)
+    author = get_object_or_404(
+        User.objects.select_related('stats'), username=username)
     return render(request, 'posts/profile.html', {
-        'page_obj': page_obj(author.posts.all(), request),
+        'page_obj': page_obj(feed(author.posts.all()), request),
         'author': author,
-        'follow': (request.user.is_authenticated
-                   and request.user.username != username
-                   and Follow.objects.filter(
-                       author=author, user=request.user).exists()), })
+    })
+
+
+def export_posts(queryset, request, name):
+    file_format = request.GET.get('format', 'ndjson')
+    if file_format not in export.WRITERS:
+        raise Http404
+    response = StreamingHttpResponse(
+        export.WRITERS[file_format](queryset),
+        content_type=export.CONTENT_TYPES[file_format])
+    response['Content-Disposition'] = (
+        f'attachment; filename="{name}.{file_format}"')
+    return response
+
+
+def group_export(request, slug):
+    group = get_object_or_404(Group, slug=slug)
+    return export_posts(group.posts.all(), request, group.slug)
+
+
+def profile_export(request, username):
+    author = get_object_or_404(User, username=username)
+    return export_posts(author.posts.all(), request, author.username)
+
 
+def comments_page(post, request):
+    return CursorPaginator(
+        post.comments.select_related('author'), COMMENTS_ON_PAGE
+    ).get_page(request.GET.get('cursor'))
 
+
+def search(request):
+    form = SearchForm(request.GET or None)
+    posts = Post.objects.none()
+    if form.is_valid():
+        posts = search_posts(Post.objects.all(), form.cleaned_data['q'])
+        if form.cleaned_data['group']:
+            posts = posts.filter(group=form.cleaned_data['group'])
+        if form.cleaned_data['author']:
+            posts = posts.filter(
+                author__username=form.cleaned_data['author'])
+    return render(request, 'posts/search.html', {
+        'form': form,
+        # Выдача упорядочена по релевантности, курсор по дате тут не подходит.
+        'page_obj': page_obj(feed(posts), request, by_cursor=False),
+    })
+
+
+@page_conditions
+@versioned_cache_page(PAGE_CACHE_TIMEOUT, key_prefix='post_page')
 def post_detail(request, post_id):
+    post = get_object_or_404(feed(Post.objects.all()), pk=post_id)
     return render(request, 'posts/post_detail.html', {
-        'post': get_object_or_404(Post, pk=post_id),
-        'form': CommentForm(request.POST or None),
+        'post': post,
+        'form': CommentForm(),
+        'comments': comments_page(post, request),
+    })
+
+
+def post_comments(request, post_id):
+    post = get_object_or_404(Post, pk=post_id)
+    return render(request, 'posts/includes/comments_list.html', {
+        'post': post,
+        'comments': comments_page(post, request),
     })
 
 
@@ -54,6 +134,7 @@ def post_create(request):
     post = form.save(commit=False)
     post.author = request.user
     post.save()
+    thumbnails.generate_later(post)
     return redirect('posts:profile', username=post.author)
 
 
@@ -69,6 +150,8 @@ def post_edit(request, post_id):
     )
     if form.is_valid():
         form.save()
+        if 'image' in form.changed_data:
+            thumbnails.generate_later(post)
         return redirect('posts:post_detail', post_id=post.pk)
     return render(request, 'posts/create_post.html', {
         'form': form,
@@ -91,11 +174,11 @@ def add_comment(request, post_id):
 @login_required
 def follow_index(request):
     post_follow = Post.objects.filter(
-        author__following__user=request.user
-    )
+        timeline_entries__user=request.user
+    ).order_by('-timeline_entries__pub_date')
     return render(
         request, 'posts/follow.html',
-        {'page_obj': page_obj(post_follow, request)})
+        {'page_obj': page_obj(feed(post_follow), request)})
 
 
 @login_required
@@ -0,0 +1,22 @@
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+
+from yatube.settings import USER_CACHE_TIMEOUT
+
+
+def user_key(user_id):
+    return f'users:user:{user_id}'
+
+
+class CachedModelBackend(ModelBackend):
+    """Берёт пользователя сессии из кэша, а не из базы на каждый запрос."""
+
+    def get_user(self, user_id):
+        key = user_key(user_id)
+        user = cache.get(key)
+        if user is None:
+            user = super().get_user(user_id)
+            if user is not None:
+                cache.set(key, user, USER_CACHE_TIMEOUT)
+            return user
+        return user if self.user_can_authenticate(user) else None
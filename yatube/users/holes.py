@@ -0,0 +1,8 @@
+from django.template.loader import render_to_string
+
+from core.holes import register
+
+
+@register('user_menu')
+def user_menu(request):
+    return render_to_string('includes/user_menu.html', request=request)
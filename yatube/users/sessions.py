@@ -0,0 +1,83 @@
+from django.contrib.sessions.backends.base import CreateError
+from django.contrib.sessions.backends.cached_db import \
+    SessionStore as CachedDBStore
+from django.db import router
+
+from .tasks import flush_sessions
+
+KEY_PREFIX = 'users.sessions'
+# Номер последней сессии, отмеченной для записи в базу, и номер,
+# до которого записи уже забрал сброс.
+DIRTY_COUNT = f'{KEY_PREFIX}.dirty'
+FLUSHED = f'{KEY_PREFIX}.flushed'
+# Пока ключ есть, сброс уже стоит в очереди. Он истекает, чтобы
+# потерянная задача не остановила запись сессий навсегда.
+FLUSH_QUEUED = f'{KEY_PREFIX}.flush_queued'
+FLUSH_QUEUED_TIMEOUT = 60 * 10
+
+
+def dirty_key(index):
+    return f'{DIRTY_COUNT}.{index}'
+
+
+class SessionStore(CachedDBStore):
+    """Сессии в кэше с отложенной записью в базу.
+
+    Запрос читает и пишет только кэш и отмечает сессию в списке на запись,
+    а строки django_session обновляет одна фоновая задача на все сессии,
+    изменённые с прошлого сброса. Пока она не выполнена, сессия живёт лишь
+    в кэше: если кэш её потеряет, пользователю придётся войти заново.
+    """
+
+    cache_key_prefix = KEY_PREFIX
+
+    def save(self, must_create=False):
+        if self.session_key is None:
+            return self.create()
+        data = self._get_session(no_load=must_create)
+        if must_create:
+            if not self._cache.add(
+                    self.cache_key, data, self.get_expiry_age()):
+                raise CreateError
+        else:
+            self._cache.set(self.cache_key, data, self.get_expiry_age())
+        self.mark_dirty()
+
+    def mark_dirty(self):
+        """Добавляет сессию в список на запись и ставит сброс в очередь."""
+        self._cache.add(DIRTY_COUNT, 0, None)
+        index = self._cache.incr(DIRTY_COUNT)
+        self._cache.set(dirty_key(index), self.session_key, None)
+        if self._cache.get(FLUSHED, 0) >= index:
+            # Сброс уже забрал этот номер и мог не увидеть запись,
+            # либо счётчик пропал из кэша и начался заново.
+            self.persist()
+        if self._cache.add(FLUSH_QUEUED, True, FLUSH_QUEUED_TIMEOUT):
+            flush_sessions.delay()
+
+    @classmethod
+    def flush_dirty(cls):
+        """Записывает в базу все сессии, отмеченные с прошлого сброса."""
+        cache = cls()._cache
+        # Снимается до чтения списка: сессия, отмеченная позже,
+        # поставит в очередь следующий сброс.
+        cache.delete(FLUSH_QUEUED)
+        done = cache.get(FLUSHED, 0)
+        last = cache.get(DIRTY_COUNT, 0)
+        # Номер фиксируется до чтения записей, чтобы mark_dirty мог
+        # заметить запись, сделанную уже после чтения.
+        cache.set(FLUSHED, last, None)
+        keys = [dirty_key(index) for index in range(done + 1, last + 1)]
+        for session_key in set(cache.get_many(keys).values()):
+            cls(session_key).persist()
+        cache.delete_many(keys)
+
+    def persist(self):
+        """Записывает в базу то, что сейчас лежит в кэше."""
+        data = self._cache.get(self.cache_key)
+        if data is None:
+            # Сессия уже удалена или истекла.
+            return
+        self._session_cache = data
+        session = self.create_model_instance(data)
+        session.save(using=router.db_for_write(self.model, instance=session))
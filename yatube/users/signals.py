@@ -0,0 +1,14 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .backends import user_key
+
+User = get_user_model()
+
+
+@receiver([post_save, post_delete], sender=User)
+def forget_user(sender, instance, **kwargs):
+    """Смена пароля, профиля или входа сбрасывает пользователя из кэша."""
+    cache.delete(user_key(instance.pk))
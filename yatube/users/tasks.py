@@ -0,0 +1,19 @@
+from django.core.mail import EmailMultiAlternatives
+
+from core.tasks import task
+
+
+@task
+def send_email(subject, body, from_email, recipients, html_body=None):
+    message = EmailMultiAlternatives(subject, body, from_email, recipients)
+    if html_body is not None:
+        message.attach_alternative(html_body, 'text/html')
+    message.send()
+
+
+@task
+def flush_sessions():
+    """Переносит в базу сессии, изменённые в кэше с прошлого сброса."""
+    # Модуль сессий сам импортирует эту задачу.
+    from .sessions import SessionStore
+    SessionStore.flush_dirty()
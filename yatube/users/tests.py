@@ -1,4 +1,24 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
 from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.models import Task
+from users.backends import user_key
+
+User = get_user_model()
+
+USERNAME = 'Author'
+PASSWORD = 'old-secret-42'
+NEW_PASSWORD = 'new-secret-42'
+INDEX_URL = reverse('posts:index')
+PASSWORD_CHANGE_URL = reverse('users:password_change')
 
 
 class PostURLTests(TestCase):
@@ -19,3 +39,71 @@ class PostURLTests(TestCase):
             with self.subTest(template=template):
                 response = self.guest_client.get(url)
                 self.assertTemplateUsed(response, template)
+
+
+class CachedAuthTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.user = User.objects.create_user(
+            username=USERNAME, password=PASSWORD)
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def test_authenticated_request_skips_session_and_user_queries(self):
+        self.client.get(INDEX_URL)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(INDEX_URL)
+        self.assertEqual(response.wsgi_request.user, self.user)
+        for query in queries.captured_queries:
+            with self.subTest(sql=query['sql']):
+                self.assertNotIn('django_session', query['sql'])
+                self.assertNotIn(
+                    'FROM "auth_user" WHERE "auth_user"."id"', query['sql'])
+
+    def test_password_change_logs_out_other_sessions(self):
+        other = Client()
+        other.force_login(self.user)
+        other.get(INDEX_URL)
+        self.assertIsNotNone(cache.get(user_key(self.user.pk)))
+        self.client.post(PASSWORD_CHANGE_URL, {
+            'old_password': PASSWORD,
+            'new_password1': NEW_PASSWORD,
+            'new_password2': NEW_PASSWORD,
+        })
+        self.assertTrue(
+            self.client.get(INDEX_URL).wsgi_request.user.is_authenticated)
+        self.assertFalse(
+            other.get(INDEX_URL).wsgi_request.user.is_authenticated)
+
+    def test_saving_user_drops_cached_copy(self):
+        self.client.get(INDEX_URL)
+        self.user.first_name = 'Новое имя'
+        self.user.save()
+        self.assertIsNone(cache.get(user_key(self.user.pk)))
+        self.assertEqual(
+            self.client.get(INDEX_URL).wsgi_request.user.first_name,
+            'Новое имя')
+
+    @mock.patch('core.tasks.TASKS_EAGER', False)
+    def test_session_is_written_to_db_by_worker(self):
+        Session.objects.all().delete()
+        Task.objects.all().delete()
+        client = Client()
+        client.force_login(self.user)
+        other = Client()
+        other.force_login(self.user)
+        self.assertFalse(Session.objects.exists())
+        self.assertEqual(
+            list(Task.objects.values_list('name', flat=True)),
+            ['users.tasks.flush_sessions'])
+        self.assertTrue(
+            client.get(INDEX_URL).wsgi_request.user.is_authenticated)
+        call_command('run_worker', once=True, workers=0, stdout=mock.Mock())
+        self.assertEqual(
+            set(Session.objects.values_list('session_key', flat=True)),
+            {client.session.session_key, other.session.session_key})
+        session = Session.objects.get(
+            session_key=client.session.session_key)
+        self.assertEqual(
+            session.get_decoded()['_auth_user_id'], str(self.user.pk))
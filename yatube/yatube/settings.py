@@ -10,11 +10,18 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/2.2/ref/settings/
 """
 
+import atexit
 import os
+import shutil
+import sys
+import tempfile
 
 # Build paths inside the project like this: os.path.join(BASE_DIR, ...)
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
+# manage.py test или pytest.
+TESTING = sys.argv[1:2] == ['test'] or 'pytest' in sys.modules
+
 
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/2.2/howto/deployment/checklist/
@@ -23,7 +30,7 @@ BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 SECRET_KEY = '9i84053nw6-1*5wrbe3xe3rc!ws!-&ic!1_dwtvc2473dr+so$'
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+DEBUG = os.getenv('DJANGO_DEBUG', 'True') == 'True'
 
 ALLOWED_HOSTS = [
     'localhost',
@@ -50,11 +57,15 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.metrics.collect_metrics',
+    'core.middleware.query_stats',
+    'core.middleware.replica_reads',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.holes.fill_holes',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -92,6 +103,48 @@ DATABASES = {
     }
 }
 
+# Копии базы только для чтения: пути через запятую. Их наполняет
+# manage.py sync_replicas, а в тестах они зеркалят основную базу.
+REPLICA_DATABASES = []
+for number, path in enumerate(
+        filter(None, os.getenv('DATABASE_REPLICAS', '').split(',')), 1):
+    DATABASES[f'replica_{number}'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': path,
+        'TEST': {'MIRROR': 'default'},
+    }
+    REPLICA_DATABASES.append(f'replica_{number}')
+DATABASE_ROUTERS = ['core.db_routers.ReplicaRouter']
+
+# Профиль SQLite: production включает WAL, чтобы чтение не мешало записи,
+# настраивает PRAGMA каждого нового соединения и держит соединения
+# открытыми между запросами. default оставляет SQLite как есть.
+DB_PROFILES = {
+    'default': {
+        'PRAGMAS': {},
+        'CONN_MAX_AGE': 0,
+        'TIMEOUT': 5,
+    },
+    'production': {
+        'PRAGMAS': {
+            'journal_mode': 'WAL',
+            'synchronous': 'NORMAL',
+            'cache_size': -64000,
+            'mmap_size': 256 * 1024 * 1024,
+            'busy_timeout': 20000,
+            'temp_store': 'MEMORY',
+        },
+        'CONN_MAX_AGE': 600,
+        'TIMEOUT': 20,
+    },
+}
+DB_PROFILE = os.getenv('DB_PROFILE', 'default')
+for database in DATABASES.values():
+    database['CONN_MAX_AGE'] = DB_PROFILES[DB_PROFILE]['CONN_MAX_AGE']
+    database['OPTIONS'] = {'timeout': DB_PROFILES[DB_PROFILE]['TIMEOUT']}
+# Сколько секунд после записи пользователь читает только из основной базы.
+REPLICA_PIN_SECONDS = 10
+
 
 # Password validation
 # https://docs.djangoproject.com/en/2.2/ref/settings/#auth-password-validators
@@ -136,18 +189,92 @@ LOGIN_URL = 'users:login'
 LOGIN_REDIRECT_URL = 'posts:index'
 # LOGOUT_REDIRECT_URL = 'posts:index'
 
+# Сессия и её пользователь читаются из кэша, а не из базы на каждый
+# запрос; в django_session сессию записывает фоновая задача.
+SESSION_ENGINE = 'users.sessions'
+AUTHENTICATION_BACKENDS = ['users.backends.CachedModelBackend']
+# Сколько секунд пользователь хранится в кэше; при сохранении он
+# сбрасывается сразу.
+USER_CACHE_TIMEOUT = 60 * 15
+
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 
 POSTS_ON_PAGE = 10
+COMMENTS_ON_PAGE = 20
+# Курсорная паджинация по (pub_date, id) вместо OFFSET и COUNT(*) в лентах.
+CURSOR_PAGINATION = False
+# Сколько последних постов хранится в ленте подписок каждого пользователя.
+FOLLOW_FEED_SIZE = 1000
+
+# Запросы страниц сверх этих порогов (число обращений к базе и секунды)
+# попадают в лог вместе с самым медленным SQL.
+QUERY_BUDGET = int(os.getenv('QUERY_BUDGET', 20))
+QUERY_TIME_BUDGET = float(os.getenv('QUERY_TIME_BUDGET', 0.5))
+
+# Фоновые задачи выполняет manage.py run_worker. В тестах, или
+# с TASKS_EAGER=True, они выполняются сразу в запросе.
+TASKS_EAGER = os.getenv('TASKS_EAGER', str(TESTING)) == 'True'
+TASK_WORKERS = 4
+TASK_RETRIES = 3
+# Пауза перед повтором в секундах, удваивается с каждой попыткой.
+TASK_RETRY_DELAY = 10
+# Через сколько секунд задача упавшего воркера вернётся в очередь.
+TASK_TIMEOUT = 600
+# Если готовая задача ждёт дольше, в лог пишется предупреждение:
+# скорее всего, run_worker не запущен. Проверка не чаще раза в минуту.
+TASK_BACKLOG_AGE = 60 * 5
+TASK_BACKLOG_CHECK_INTERVAL = 60
+
+# Каталог, через который воркеры делятся метриками для /metrics;
+# без него отдаются счётчики только того процесса, что принял запрос.
+METRICS_DIR = os.getenv('METRICS_DIR', '')
+# Как часто, в секундах, процесс сохраняет свои счётчики в каталог.
+METRICS_FLUSH_INTERVAL = 5
+# Адреса, с которых /metrics доступен без входа под сотрудником.
+# По умолчанию таких нет: за обратным прокси на той же машине все
+# клиенты приходят с 127.0.0.1, и такой список открыл бы метрики всем.
+METRICS_ALLOWED_IPS = tuple(filter(None, os.getenv(
+    'METRICS_ALLOWED_IPS', '').split(',')))
 
 CSRF_FAILURE_VIEW = 'core.views.csrf_failure'
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Размеры миниатюр из шаблонов: их создают сразу после загрузки картинки.
+THUMBNAIL_GEOMETRIES = [
+    ('960x339', {'padding': True, 'upscale': True}),
+]
+THUMBNAIL_KVSTORE = 'core.kvstore.KVStore'
+
+# Страницы сбрасываются при любом изменении постов, групп, комментариев
+# и подписок, поэтому их можно хранить долго.
+PAGE_CACHE_TIMEOUT = 60 * 60 * 6
+
+# Общий для всех воркеров кэш лежит в файлах, а перед ним у каждого
+# процесса свой небольшой LRU. Каталог должен быть общим для воркеров.
+CACHE_LOCATION = os.getenv(
+    'CACHE_LOCATION', os.path.join(tempfile.gettempdir(), 'yatube-cache'))
+if TESTING:
+    # У каждого запуска тестов свой кэш: кэш работающего сайта они
+    # не очищают и друг другу не мешают.
+    CACHE_LOCATION = tempfile.mkdtemp(prefix='yatube-test-cache-')
+    atexit.register(shutil.rmtree, CACHE_LOCATION, ignore_errors=True)
 CACHES = {
     'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-    }
+        'BACKEND': 'core.cache_backends.TwoTierCache',
+        'LOCATION': CACHE_LOCATION,
+        'OPTIONS': {
+            'SHARED': 'shared',
+            'LOCAL_SIZE': 1000,
+        },
+    },
+    'shared': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(CACHE_LOCATION, 'data'),
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+        },
+    },
 }